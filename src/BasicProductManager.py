@@ -1,180 +1,599 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from dataclasses import replace
+from itertools import islice
+import numpy as np
 from Product import Product
+from BudgetCombinations import (
+    iter_combinations_within_budget,
+    count_combinations_within_budget,
+    best_combination_within_budget,
+    top_combinations_within_budget,
+)
+from ProductStore import ColumnarProductStore
+from SortedIndex import SortedIndex, SliceView, INDEXED_FIELDS
+from ExponentialSearch import exponential_search, exponential_search_many
+from InterpolationSearch import interpolation_bound, interpolation_search
+from RevenueAggregator import RevenueAggregator, GROUP_FIELDS
+from SortEngine import sort_products, lexsort_order, normalize_keys
+from NameIndex import NameIndex
+from Snapshot import MappedProductStore, open_snapshot, save_snapshot
+from Instrumentation import Instrumentation, get_logger, instrumented
+
+logger = get_logger("BasicProductManager")
+
+
+def _entry_value(entry: Tuple) -> float:
+    # Search key of a (value, product_id) sorted-index entry
+    return entry[0]
+
+
+def _id_array(product_ids: Sequence[int]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    # Product IDs as an int64 array, plus a mask of the usable IDs when some are not (else None). As with
+    # binary_search, only whole numbers int64 can hold can match; the others are replaced by 0 here and
+    # must be reported as missing, rather than truncated to some other product's ID
+    values = np.asarray(product_ids)
+    if values.dtype.kind in "bi":
+        return values.astype(np.int64, copy=False), None
+    limits = np.iinfo(np.int64)
+    if values.dtype.kind == "f" and isinstance(product_ids, np.ndarray):
+        usable = (values == np.floor(values)) & (values >= limits.min) & (values < -float(limits.min))
+        return np.where(usable, values, 0).astype(np.int64), usable
+    # Lists mixing floats, huge or non-numeric values, and unsigned arrays: compare each ID exactly
+    items = values.tolist() if isinstance(product_ids, np.ndarray) else product_ids
+    ids = [_whole_id(product_id, limits) for product_id in items]
+    usable = np.array([product_id is not None for product_id in ids], dtype=bool)
+    return np.array([product_id or 0 for product_id in ids], dtype=np.int64), usable
+
+
+def _whole_id(value, limits: np.iinfo) -> Optional[int]:
+    # value as an int if it is a whole number int64 can hold, else None
+    try:
+        product_id = int(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return product_id if product_id == value and limits.min <= product_id <= limits.max else None
+
 
 class BasicProductManager:
-    def __init__(self):
-        # Initialize an empty list to store products
-        self.products: List[Product] = [] 
+    def __init__(self, store: Optional[ColumnarProductStore] = None, metrics: Optional[Instrumentation] = None):
+        # Initialize an empty list to store products, or use a columnar store as the backing
+        # Operation counters, latency histograms and event hooks (see Instrumentation)
+        self.metrics = metrics or Instrumentation()
+        self._products: Union[List[Product], ColumnarProductStore] = store if store is not None else []
+        # Primary-key index mapping product_id to its position in self.products; built on first use
+        self._position_index: Optional[Dict[int, int]] = None
+        # Lazily rebuilt sorted product IDs used by binary_search; None when stale
+        self._sorted_ids: Optional[List[int]] = None
+        # Lazily rebuilt (sorted product IDs, their positions) arrays used by binary_search_many
+        self._id_lookup: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        # Secondary sorted indexes on INDEXED_FIELDS, built on first use and then maintained incrementally
+        self._secondary: Dict[str, SortedIndex] = {}
+        # Running revenue totals, built on first use and then maintained incrementally
+        self._revenue: Optional[RevenueAggregator] = None
+        # Case-folded product-name index, built on first use and then maintained incrementally
+        self._names: Optional[NameIndex] = None
+        self._reindex()
+
+    @property
+    def products(self) -> Union[List[Product], ColumnarProductStore]:
+        return self._products
+
+    @products.setter
+    def products(self, products: Union[List[Product], ColumnarProductStore]):
+        # Replacing the product collection rebuilds every index over it
+        self._products = products
+        self._secondary = {}
+        self._revenue = None
+        self._names = None
+        self._reindex()
+
+    @classmethod
+    def open_snapshot(cls, path: str, mode: str = "c",
+                      metrics: Optional[Instrumentation] = None) -> "BasicProductManager":
+        # Open a saved snapshot without loading it: columns are memory-mapped and products are built
+        # only when read. mode "r" rejects edits, "c" keeps them in memory (see Snapshot)
+        return cls(store=open_snapshot(path, mode), metrics=metrics)
+
+    def save_snapshot(self, path: str) -> Dict:
+        # Write the catalog as a memory-mappable snapshot directory and return its manifest
+        return save_snapshot(self._products, path)
+
+    @property
+    def is_columnar(self) -> bool:
+        # True when products are backed by a ColumnarProductStore instead of a list
+        return isinstance(self._products, ColumnarProductStore)
+
+    def _reindex(self):
+        # Invalidate the product_id -> position index after a bulk change such as a sort
+        self._position_index = None
+        self._indexed_count = len(self._products)
+        self._sorted_ids = self._id_lookup = None
+
+    @property
+    def _positions(self) -> Dict[int, int]:
+        # The product_id -> position index, rebuilt from the products when invalidated
+        if self._position_index is None:
+            if self.is_columnar:
+                ids = self._products.column("product_id").tolist()
+            else:
+                ids = [p.product_id for p in self._products]
+            self._position_index = {product_id: position for position, product_id in enumerate(ids)}
+        return self._position_index
+
+    def _id_at(self, position: int) -> int:
+        # Read the product_id stored at a position without materializing the product
+        if self.is_columnar:
+            return int(self._products.column("product_id")[position])
+        return self._products[position].product_id
+
+    def _field_at(self, position: int, field: str):
+        # Read one field value stored at a position without materializing the product
+        if self.is_columnar:
+            value = self._products.column(field)[position]
+            # Object columns (product_name) already hold Python values
+            return value.item() if isinstance(value, np.generic) else value
+        return getattr(self._products[position], field)
+
+    def secondary_index(self, field: str) -> SortedIndex:
+        # Return the sorted index for a field, building it on first use
+        if self._indexed_count != len(self._products):
+            # Products were appended or removed behind the manager's back
+            self._reindex()
+            self._secondary = {}
+        index = self._secondary.get(field)
+        if index is None:
+            if field not in INDEXED_FIELDS:
+                raise ValueError(f"Field {field} is not indexed; choose one of {INDEXED_FIELDS}.")
+            if self.is_columnar:
+                values = self._products.column(field)
+                ids = self._products.column("product_id")
+                index = SortedIndex(field)
+                index.entries = list(zip(values.tolist(), ids.tolist()))
+                index.entries.sort()
+            else:
+                index = SortedIndex.build(field, self._products)
+            self._secondary[field] = index
+        return index
+
+    @property
+    def revenue(self) -> RevenueAggregator:
+        # Running revenue totals, overall and by category, supplier_id and customer_segment
+        if self._revenue is None or self._revenue.count != len(self._products):
+            if self.is_columnar:
+                self._revenue = RevenueAggregator.from_store(self._products)
+            else:
+                self._revenue = RevenueAggregator.from_products(self._products)
+        return self._revenue
+
+    @property
+    def name_index(self) -> NameIndex:
+        # Case-folded name index for exact, prefix and fuzzy name search
+        if self._names is None or len(self._names) != len(self._products):
+            if self.is_columnar:
+                names = self._products.column("product_name").tolist()
+                self._names = NameIndex.from_pairs(zip(names, self._products.column("product_id").tolist()))
+            else:
+                self._names = NameIndex.build(self._products)
+        return self._names
+
+    def build_indexes(self, *names: str):
+        # Build lazily created indexes now, e.g. before sharing the manager with reader threads:
+        # "ids" (primary key and sorted IDs), "names", "revenue", or any of INDEXED_FIELDS
+        for name in names:
+            if name == "ids":
+                self._sorted_id_arrays()
+                if self._sorted_ids is None:
+                    self._sorted_ids = sorted(self._positions)
+            elif name == "names":
+                self.name_index
+            elif name == "revenue":
+                self.revenue
+            else:
+                self.secondary_index(name)
+
+    def revenue_by(self, field: str) -> Dict:
+        # Revenue broken down by one of GROUP_FIELDS, read from the running totals
+        return self.revenue.revenue_by(field)
+
+    @instrumented()
+    def range_query(self, field: str, low=None, high=None, limit: Optional[int] = None) -> List[Product]:
+        # Return products with low <= field <= high in field order (the first limit of them if given),
+        # without re-sorting; the matches are fetched with one batched ID lookup
+        index = self.secondary_index(field)
+        start, stop = index.bounds(low, high)
+        if limit is not None:
+            stop = min(stop, start + limit)
+        return self.binary_search_many([product_id for _, product_id in index.entries[start:stop]])
+
+    @instrumented()
+    def find_by_rating(self, rating: float) -> Optional[Product]:
+        # Exponential search over the maintained rating index instead of a freshly sorted list
+        entry = exponential_search(self.secondary_index("rating").entries, rating, key=_entry_value)
+        return self.get_product(entry[1]) if entry else None
+
+    @instrumented()
+    def find_by_rating_many(self, ratings: Sequence[float]) -> List[Optional[Product]]:
+        # Batched find_by_rating: one galloping pass over the rating index for all ratings,
+        # returning one product per rating, in order, with None where no product has that rating
+        entries = exponential_search_many(self.secondary_index("rating").entries, ratings, key=_entry_value)
+        return [self.get_product(entry[1]) if entry else None for entry in entries]
+
+    @instrumented()
+    def find_by_price_many(self, prices: Sequence[float]) -> List[Optional[Product]]:
+        # Batched exact-price lookup over the price index, aligned with prices, None where not found
+        entries = exponential_search_many(self.secondary_index("price").entries, prices, key=_entry_value)
+        return [self.get_product(entry[1]) if entry else None for entry in entries]
+
+    def _position_of(self, product_id: int) -> Optional[int]:
+        # O(1) position lookup; the index heals itself if the list was reordered or grown externally
+        if (self._position_index is None and isinstance(self._products, MappedProductStore)
+                and self._products.has_id_index):
+            # An unmodified snapshot answers from its on-disk ID index, so opening never builds the dict
+            return self._products.row_of(product_id)
+        position = self._positions.get(product_id)
+        if position is not None and position < len(self._products) and self._id_at(position) == product_id:
+            return position
+        if position is not None or self._indexed_count != len(self._products):
+            self._reindex()
+            return self._positions.get(product_id)
+        return None
 
+    def _snapshot(self, position: int) -> Product:
+        # Return a detached copy of the product at a position, unaffected by later in-place updates
+        product = self._products[position]
+        return product if self.is_columnar else replace(product)
+
+    def get_product(self, product_id: int) -> Optional[Product]:
+        # Return the product with the given ID in O(1) using the primary-key index
+        position = self._position_of(product_id)
+        return self._products[position] if position is not None else None
+
+    @instrumented()
     def add_product(self, product: Product):
         # Add a new product to the product list
-        self.products.append(product)
-        print(f"Product {product.product_name} added.")
+        self._products.append(product)
+        self._positions[product.product_id] = len(self._products) - 1
+        self._indexed_count += 1
+        self._sorted_ids = self._id_lookup = None
+        for field, index in self._secondary.items():
+            index.add(getattr(product, field), product.product_id)
+        if self._revenue is not None:
+            self._revenue.add(product)
+        if self._names is not None:
+            self._names.add(product.product_name, product.product_id)
+        self.metrics.emit("product_added", product_id=product.product_id)
+        logger.info("Product %s added.", product.product_name)
+
+    @instrumented()
+    def add_products(self, products: Iterable[Product]):
+        # Add a batch of products without per-item console output
+        products = list(products)
+        start = len(self._products)
+        self._products.extend(products)
+        self._index_appended(start, [p.product_id for p in products])
+
+    @instrumented()
+    def add_columns(self, columns: Dict[str, Sequence]):
+        # Add a batch given as one array per field; store-backed managers copy it straight into their columns
+        if not self.is_columnar:
+            self.add_products(ColumnarProductStore.from_columns(columns))
+            return
+        start = len(self._products)
+        self._products.extend_columns(columns)
+        self._index_appended(start, self._products.column("product_id")[start:].tolist())
+
+    def _index_appended(self, start: int, product_ids: List[int]):
+        # Register a batch of products appended at positions start, start + 1, ...
+        self._positions.update(zip(product_ids, range(start, start + len(product_ids))))
+        self._indexed_count += len(product_ids)
+        self._sorted_ids = self._id_lookup = None
+        # Large batches make a later rebuild cheaper than inserting into the sorted indexes one by one
+        if len(product_ids) * 8 > len(self._products):
+            self._secondary = {}
+            self._revenue = None
+            self._names = None
+        for field, index in self._secondary.items():
+            for position in range(start, start + len(product_ids)):
+                index.add(self._field_at(position, field), self._id_at(position))
+        if self._revenue is not None:
+            for position in range(start, start + len(product_ids)):
+                self._revenue.add(self._products[position])
+        if self._names is not None:
+            for position in range(start, start + len(product_ids)):
+                self._names.add(self._field_at(position, "product_name"), self._id_at(position))
 
+    @instrumented()
     def update_product(self, product_id: int, **updates):
         # Update specific fields of a product identified by product_id
-        for product in self.products:
-            if product.product_id == product_id:
-                # Update each specified field if it exists on the product
-                for key, value in updates.items():
-                    if hasattr(product, key):
-                        setattr(product, key, value)
-                        print(f"Updated {key} of Product ID {product_id} to {value}.")
-                    else:
-                        print(f"Field {key} does not exist on Product.")
-                return
-        print(f"Product with ID {product_id} not found.")
+        position = self._position_of(product_id)
+        if position is None:
+            self.metrics.emit("product_not_found", product_id=product_id)
+            logger.warning("Product with ID %s not found.", product_id)
+            return
+        # Take the built secondary indexes' entries out before the values change
+        touched = [f for f in self._secondary if f in updates or "product_id" in updates]
+        old_values = {f: self._field_at(position, f) for f in touched}
+        for field in touched:
+            self._secondary[field].remove(old_values[field], product_id)
+        # Likewise take the product's old contribution out of the running revenue totals
+        revenue_fields = {"price", "sales_volume", *GROUP_FIELDS}
+        revenue_touched = self._revenue is not None and not revenue_fields.isdisjoint(updates)
+        if revenue_touched:
+            self._revenue.remove(self._snapshot(position))
+        names_touched = self._names is not None and ("product_name" in updates or "product_id" in updates)
+        if names_touched:
+            self._names.remove(product_id)
+        if self.is_columnar:
+            self._update_columnar_product(position, product_id, **updates)
+        else:
+            self._update_listed_product(position, product_id, **updates)
+        new_id = self._id_at(position)
+        for field in touched:
+            self._secondary[field].add(self._field_at(position, field), new_id)
+        if revenue_touched:
+            self._revenue.add(self._products[position])
+        if names_touched:
+            self._names.add(self._field_at(position, "product_name"), new_id)
+        if "product_id" in updates:
+            self._reindex()
+
+    def _update_listed_product(self, position: int, product_id: int, **updates):
+        # Update fields on the Product object held in the list
+        product = self._products[position]
+        # Frozen records cannot be mutated, so they are replaced by an updated copy instead
+        frozen = type(product).__dataclass_params__.frozen
+        # Update each specified field if it exists on the product
+        for key, value in updates.items():
+            if hasattr(product, key):
+                if frozen:
+                    product = replace(product, **{key: value})
+                    self._products[position] = product
+                else:
+                    setattr(product, key, value)
+                self.metrics.emit("field_updated", product_id=product_id, field=key)
+                logger.info("Updated %s of Product ID %s to %s.", key, product_id, value)
+            else:
+                logger.warning("Field %s does not exist on Product.", key)
+
+    def _update_columnar_product(self, position: int, product_id: int, **updates):
+        # Update fields directly in the columns of the store-backed row
+        for key, value in updates.items():
+            if key in self._products.columns:
+                self._products.update_row(position, **{key: value})
+                self.metrics.emit("field_updated", product_id=product_id, field=key)
+                logger.info("Updated %s of Product ID %s to %s.", key, product_id, value)
+            else:
+                logger.warning("Field %s does not exist on Product.", key)
     
+    @instrumented()
     def delete_product(self, product_id: int):
-        # Delete a product by filtering out the product with the given ID
-        self.products = [p for p in self.products if p.product_id != product_id]
-        print(f"Product with ID {product_id} deleted.")
+        # Delete a product in O(1) by moving the last product into its slot
+        position = self._position_of(product_id)
+        if position is None:
+            self.metrics.emit("product_not_found", product_id=product_id)
+            logger.warning("Product with ID %s not found.", product_id)
+            return
+        for field, index in self._secondary.items():
+            index.remove(self._field_at(position, field), product_id)
+        if self._revenue is not None:
+            self._revenue.remove(self._products[position])
+        if self._names is not None:
+            self._names.remove(product_id)
+        del self._positions[product_id]
+        self._indexed_count -= 1
+        if self.is_columnar:
+            moved_from = self._products.swap_remove(position)
+        else:
+            last = self._products.pop()
+            moved_from = len(self._products) if position < len(self._products) else None
+            if moved_from is not None:
+                self._products[position] = last
+        if moved_from is not None:
+            # Point the moved product's index entry at its new slot
+            self._positions[self._id_at(position)] = position
+        self._sorted_ids = self._id_lookup = None
+        self.metrics.emit("product_deleted", product_id=product_id)
+        logger.info("Product with ID %s deleted.", product_id)
+
+    @instrumented()
+    def filter_products(self, **conditions) -> List[Product]:
+        # Return products matching all conditions; a (low, high) tuple selects an inclusive range
+        if self.is_columnar:
+            return self.products.filter(**conditions)
+
+        def matches(product: Product) -> bool:
+            for key, condition in conditions.items():
+                value = getattr(product, key)
+                if isinstance(condition, tuple):
+                    low, high = condition
+                    if (low is not None and value < low) or (high is not None and value > high):
+                        return False
+                elif value != condition:
+                    return False
+            return True
+
+        return [p for p in self.products if matches(p)]
 
+    @instrumented()
+    def sorted_products(self, key: Union[str, Sequence[str]] = "price",
+                        descending: Union[bool, Sequence[bool]] = False) -> List[Product]:
+        # Return products sorted by one or more fields without reordering the manager's storage
+        return sort_products(self.products, key, descending)
+
+    @instrumented()
     def calculate_total_revenue(self, index=0) -> float:
-        # Recursively calculate the total revenue of all products
-        if index >= len(self.products):
-            return 0
-        # Calculate revenue for the current product
-        current_product = self.products[index]
-        current_revenue = current_product.sales_volume * current_product.price
-        # Recursively add revenue of remaining products
-        return current_revenue + self.calculate_total_revenue(index + 1)
+        # Calculate the total revenue of all products from the running totals in O(1);
+        # a non-zero index sums the products from that position on in a single loop
+        if index == 0:
+            return self.revenue.total
+        if self.is_columnar:
+            return float(self._products.column("sales_volume")[index:] @ self._products.column("price")[index:])
+        return sum(p.sales_volume * p.price for p in self._products[index:])
     
-    def find_combinations_within_budget(self, budget: float):
-        # Use backtracking to find all product combinations within a given budget
-        def backtrack(start: int, current_combination: List[Product], current_price: float):
-            if current_price <= budget:
-                # Print a valid combination if within budget
-                print(f"Valid combination: {[p.product_name for p in current_combination]} - Total Price: {current_price:.2f}")
-            # Try adding each product to the combination if within budget
-            for i in range(start, len(self.products)):
-                product = self.products[i]
-                if current_price + product.price <= budget:
-                    backtrack(i + 1, current_combination + [product], current_price + product.price)
-        
-        # Start backtracking from the first product
-        backtrack(0, [], 0)
+    def find_combinations_within_budget(self, budget: float, limit: Optional[int] = None):
+        # Print product combinations within a given budget, streaming them from the backtracking
+        # generator; limit caps how many are printed
+        combinations = iter_combinations_within_budget(list(self.products), budget)
+        for combination, total_price in islice(combinations, limit):
+            print(f"Valid combination: {[p.product_name for p in combination]} - Total Price: {total_price:.2f}")
+
+    @instrumented()
+    def count_combinations_within_budget(self, budget: float) -> int:
+        # Count combinations within budget with a DP over budget instead of enumerating them
+        return count_combinations_within_budget(list(self.products), budget)
+
+    @instrumented()
+    def best_combination_within_budget(self, budget: float, value="profit") -> Tuple[Tuple[Product, ...], float]:
+        # Return the combination within budget maximizing total profit, sales or a custom value
+        return best_combination_within_budget(list(self.products), budget, value)
+
+    @instrumented()
+    def top_combinations_within_budget(self, budget: float, n: int = 10,
+                                       max_results: Optional[int] = None) -> List[Tuple[Tuple[Product, ...], float]]:
+        # Return the n combinations closest to the budget, examining at most max_results of them
+        return top_combinations_within_budget(list(self.products), budget, n, max_results=max_results)
         
+    @instrumented()
     def linear_search(self, product_name: str) -> Optional[Product]:
-        # Perform a linear search to find a product by name
-        for product in self.products:
-            if product.product_name.lower() == product_name.lower():
-                return product
-        return None
+        # Find a product by name, ignoring case, in O(1) through the name index
+        product_ids = self.name_index.find(product_name)
+        if not product_ids:
+            return None
+        # Among products sharing the name, return the first one in storage order as a scan would
+        return self.get_product(min(product_ids, key=self._position_of))
+
+    @instrumented()
+    def prefix_search(self, prefix: str, limit: Optional[int] = None) -> List[Product]:
+        # Return products whose name starts with prefix, ignoring case, in name order
+        return [self.get_product(product_id) for product_id in self.name_index.prefix(prefix, limit)]
 
+    @instrumented()
+    def fuzzy_search(self, query: str, limit: int = 10, min_similarity: float = 0.3) -> List[Product]:
+        # Return products whose name approximately matches the query (typos, word order), best first
+        matches = self.name_index.fuzzy(query, limit, min_similarity)
+        return [self.get_product(product_id) for product_id, _ in matches]
+
+    @instrumented()
     def binary_search(self, product_id: int) -> Optional[Product]:
-        # Perform a binary search for a product by product_id; assumes products are sorted by product_id
-        self.products.sort(key=lambda p: p.product_id)
-        low, high = 0, len(self.products) - 1
+        # Perform a binary search for a product by product_id over the cached sorted IDs.
+        # The products themselves are never reordered; the cache is rebuilt only after adds or deletes
+        if self._indexed_count != len(self._products):
+            self._reindex()
+        if self._sorted_ids is None:
+            self._sorted_ids = sorted(self._positions)
+        sorted_ids = self._sorted_ids
+        low, high = 0, len(sorted_ids) - 1
         while low <= high:
             mid = (low + high) // 2
-            if self.products[mid].product_id == product_id:
-                return self.products[mid]
-            elif self.products[mid].product_id < product_id:
+            if sorted_ids[mid] == product_id:
+                return self.get_product(product_id)
+            elif sorted_ids[mid] < product_id:
                 low = mid + 1
             else:
                 high = mid - 1
         return None
 
-    def interpolation_search(self, price: float) -> Optional[Product]:
-        # Perform interpolation search for a product by price; assumes products are sorted by price
-        if not self.products:
-            return None
+    @instrumented()
+    def binary_search_many(self, product_ids: Sequence[int]) -> List[Optional[Product]]:
+        # Resolve many product IDs with one vectorized searchsorted over the sorted ID array.
+        # Returns one product per ID, in order, with None where an ID is not in the catalog
+        product_ids, usable = _id_array(product_ids)
+        if (self._position_index is None and isinstance(self._products, MappedProductStore)
+                and self._products.has_id_index):
+            # An unmodified snapshot searches its on-disk ID index instead of sorting the IDs
+            positions = self._products.rows_of(product_ids)
+        else:
+            sorted_ids, sorted_positions = self._sorted_id_arrays()
+            if len(sorted_ids) == 0:
+                return [None] * len(product_ids)
+            hits = np.minimum(np.searchsorted(sorted_ids, product_ids), len(sorted_ids) - 1)
+            positions = np.where(sorted_ids[hits] == product_ids, sorted_positions[hits], -1)
+        if usable is not None:
+            positions = np.where(usable, positions, -1)
+        found = np.flatnonzero(positions >= 0)
+        results: List[Optional[Product]] = [None] * len(product_ids)
+        if self.is_columnar:
+            products = self._products.take(positions[found])
+        else:
+            products = [self._products[position] for position in positions[found].tolist()]
+        for i, product in zip(found.tolist(), products):
+            results[i] = product
+        return results
 
-        self.products.sort(key=lambda p: p.price)  
-        low, high = 0, len(self.products) - 1
-
-        while low <= high and price >= self.products[low].price and price <= self.products[high].price:
-            # If all elements are equal, handle single element case
-            if low == high:
-                if self.products[low].price == price:
-                    return self.products[low]
-                return None
-
-            # Calculate the position using interpolation formula
-            pos = low + int((high - low) / (self.products[high].price - self.products[low].price) * (price - self.products[low].price))
-            
-            if self.products[pos].price == price:
-                return self.products[pos]
-            if self.products[pos].price < price:
-                low = pos + 1
-            else:
-                high = pos - 1
+    def _sorted_id_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Sorted product IDs and the position of each, built once and reused until the products change
+        if self._indexed_count != len(self._products):
+            self._reindex()
+        if self._id_lookup is None:
+            positions = self._positions
+            sorted_ids = np.fromiter(positions.keys(), dtype=np.int64, count=len(positions))
+            sorted_positions = np.fromiter(positions.values(), dtype=np.int64, count=len(positions))
+            order = np.argsort(sorted_ids, kind="stable")
+            self._id_lookup = (sorted_ids[order], sorted_positions[order])
+        return self._id_lookup
 
-        return None
+    @instrumented()
+    def interpolation_search(self, price: float, tolerance: float = 0.0) -> Optional[Product]:
+        # Perform interpolation search for a product by price over the maintained price index.
+        # Returns the lowest-priced product within tolerance of price (exact by default)
+        entry = interpolation_search(self.secondary_index("price").entries, price, key=_entry_value,
+                                     tolerance=tolerance)
+        return self.get_product(entry[1]) if entry else None
 
-    def bubble_sort(self) -> List[Product]:
-        # Sort the products by price using bubble sort
-        n = len(self.products)
-        for i in range(n):
-            for j in range(0, n - i - 1):
-                if self.products[j].price > self.products[j + 1].price:
-                    # Swap products if they are out of order
-                    self.products[j], self.products[j + 1] = self.products[j + 1], self.products[j]
-        print("Products sorted using Bubble Sort.")
+    def range_view(self, field: str, low=None, high=None) -> SliceView:
+        # Products with low <= field <= high in field order, as a lazy view over the sorted index:
+        # found in O(log n), materialized only as they are read, valid until the catalog changes
+        return self.secondary_index(field).view(low, high, transform=lambda entry: self.get_product(entry[1]))
+
+    def find_all_by_price(self, price: float, tolerance: float = 0.005) -> SliceView:
+        # Lazy view of every product priced within tolerance of price; the default absorbs rounding
+        # to whole cents. Interpolation finds the bounds without degrading on skewed prices
+        entries = self.secondary_index("price").entries
+        start = interpolation_bound(entries, price - tolerance, key=_entry_value)
+        stop = interpolation_bound(entries, price + tolerance, key=_entry_value, right=True, low=start)
+        return SliceView(entries, start, stop, transform=lambda entry: self.get_product(entry[1]))
+
+    def find_all_by_rating(self, low: float, high: Optional[float] = None) -> SliceView:
+        # Lazy view of every product rated in [low, high] (exactly low if high is omitted)
+        return self.range_view("rating", low, low if high is None else high)
+
+    @instrumented()
+    def sort_products(self, keys: Union[str, Sequence[str]] = "price",
+                      descending: Union[bool, Sequence[bool]] = False, stable: bool = True,
+                      strategy: str = "auto") -> List[Product]:
+        # Reorder the products by one or more fields, each ascending or descending, using the
+        # sort engine's strategy ("auto", "timsort", "lexsort", "bubble", "merge" or "quick")
+        if self.is_columnar:
+            if strategy in ("auto", "lexsort"):
+                # Sort the columns directly instead of materializing Product objects
+                fields, directions = normalize_keys(keys, descending)
+                order = lexsort_order(self._products, fields, directions, stable)
+            else:
+                ordered = sort_products(list(self._products), keys, descending, stable, strategy)
+                order = np.fromiter((self._position_of(p.product_id) for p in ordered), dtype=np.int64, count=len(ordered))
+            self._products.permute(order)
+        else:
+            self._products[:] = sort_products(self._products, keys, descending, stable, strategy)
+        self._reindex()
         return self.products
 
-    def merge_sort(self) -> List[Product]:
-        # Sort the products by price using merge sort
-        sorted_products = self._merge_sort(self.products)
-        print("Products sorted using Merge Sort.")
-        return sorted_products
-
-    def _merge_sort(self, products: List[Product]) -> List[Product]:
-        # Helper function for merge sort (recursive)
-        if len(products) > 1:
-            mid = len(products) // 2
-            left_half = products[:mid]
-            right_half = products[mid:]
-
-            left_half = self._merge_sort(left_half)
-            right_half = self._merge_sort(right_half)
-
-            i = j = k = 0
-            # Merge the sorted halves
-            while i < len(left_half) and j < len(right_half):
-                if left_half[i].price < right_half[j].price:
-                    products[k] = left_half[i]
-                    i += 1
-                else:
-                    products[k] = right_half[j]
-                    j += 1
-                k += 1
-
-            # Add remaining elements from left and right halves
-            while i < len(left_half):
-                products[k] = left_half[i]
-                i += 1
-                k += 1
-            while j < len(right_half):
-                products[k] = right_half[j]
-                j += 1
-                k += 1
-        return products
-
-    def quick_sort(self) -> List[Product]:
-        # Sort the products by price using quick sort
-        self._quick_sort(0, len(self.products) - 1)
-        print("Products sorted using Quick Sort.")
+    @instrumented()
+    def bubble_sort(self, key: Union[str, Sequence[str]] = "price", descending: bool = False) -> List[Product]:
+        # Sort the products by a field (price by default) using bubble sort
+        self.sort_products(key, descending, strategy="bubble")
+        logger.info("Products sorted using Bubble Sort.")
+        return self.products
+
+    @instrumented()
+    def merge_sort(self, key: Union[str, Sequence[str]] = "price", descending: bool = False) -> List[Product]:
+        # Sort the products by a field (price by default) using stable bottom-up merge sort
+        self.sort_products(key, descending, strategy="merge")
+        logger.info("Products sorted using Merge Sort.")
         return self.products
 
-    def _quick_sort(self, low: int, high: int):
-        # Helper function for quick sort (recursive)
-        if low < high:
-            # Partition the array and sort the partitions
-            pi = self._partition(low, high)
-            self._quick_sort(low, pi - 1)
-            self._quick_sort(pi + 1, high)
-
-    def _partition(self, low: int, high: int) -> int:
-        # Partition function for quick sort using last element as pivot
-        pivot = self.products[high].price
-        i = low - 1
-        for j in range(low, high):
-            if self.products[j].price < pivot:
-                i += 1
-                # Swap products to place smaller elements on left
-                self.products[i], self.products[j] = self.products[j], self.products[i]
-        # Place pivot element in correct position
-        self.products[i + 1], self.products[high] = self.products[high], self.products[i + 1]
-        return i + 1
+    @instrumented()
+    def quick_sort(self, key: Union[str, Sequence[str]] = "price", descending: bool = False) -> List[Product]:
+        # Sort the products by a field (price by default) using median-of-three quick sort
+        self.sort_products(key, descending, stable=False, strategy="quick")
+        logger.info("Products sorted using Quick Sort.")
+        return self.products
@@ -0,0 +1,333 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from Product import Product
+from ProductStore import ColumnarProductStore
+from BasicProductManager import BasicProductManager
+from CatalogGenerator import CatalogGenerator
+from ExponentialSearch import exponential_search, exponential_search_many
+from HashTable import HashTableChaining, HashTableOpenAddressing, RobinHoodHashTable
+from KWayMergeSort import k_way_merge_sort
+from SortEngine import bubble_sort, merge_sort, quick_sort, sort_products
+from SupplierGraph import SupplierGraph
+
+DEFAULT_SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+DISTRIBUTIONS = ("random", "sorted", "reversed", "duplicates", "clustered")
+# Number of lookups timed per search benchmark (or the catalog size, if smaller)
+QUERY_COUNT = 1_000
+# A result is flagged when it is this many times slower (or larger) than the baseline
+DEFAULT_THRESHOLD = 1.25
+# Timings shorter than this are too noisy to flag
+MIN_SECONDS = 1e-3
+# Once a benchmark takes longer than this on a distribution, larger sizes of it are skipped
+TIME_BUDGET = 30.0
+
+# A benchmark's setup receives the products and a random generator and returns the timed callable,
+# which returns counters (probes, collisions, matches, ...) to record alongside the timing
+Setup = Callable[[List[Product], np.random.Generator], Callable[[], Dict[str, int]]]
+
+
+def make_products(n: int, distribution: str = "random", seed: int = 0) -> List[Product]:
+    # Generate n products with CatalogGenerator (lognormal prices, Zipf sales, sparse supplier IDs),
+    # then arrange product_id and price per distribution: "random" shuffles IDs, "sorted"/"reversed"
+    # order both, "duplicates" draws prices and ratings from a handful of values, and "clustered"
+    # packs IDs and prices into a few dense runs
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution {distribution}; choose one of {DISTRIBUTIONS}.")
+    columns = CatalogGenerator(seed, n_suppliers=max(2, n // 100)).columns(n)
+    rng = np.random.default_rng(seed)
+    ids = rng.permutation(n) + 1
+    prices = columns["price"]
+    if distribution == "sorted":
+        ids, prices = np.arange(1, n + 1), np.sort(prices)
+    elif distribution == "reversed":
+        ids, prices = np.arange(n, 0, -1), np.sort(prices)[::-1]
+    elif distribution == "duplicates":
+        prices = rng.choice(np.array([9.99, 19.99, 49.99, 99.99, 199.99]), n)
+        columns["rating"] = rng.choice(np.array([3.0, 4.0, 5.0]), n)
+    elif distribution == "clustered":
+        clusters = rng.integers(0, 8, n)
+        # Consecutive IDs within each cluster, clusters far apart: cluster c holds c * 1_000_003 + 0, 1, 2, ...
+        counts = np.bincount(clusters, minlength=8)
+        ranks = np.empty(n, dtype=np.int64)
+        ranks[np.argsort(clusters, kind="stable")] = np.arange(n) - np.repeat(np.cumsum(counts) - counts, counts)
+        ids = clusters * 1_000_003 + ranks
+        prices = np.round(clusters * 100 + rng.uniform(0, 1, n), 2)
+    columns["product_id"], columns["price"] = ids, prices
+    return ColumnarProductStore.from_columns(columns).to_products()
+
+
+def _price(product: Product) -> float:
+    return product.price
+
+
+def _sorting(sort: Callable[[List[Product]], object]) -> Setup:
+    # Time sorting a fresh copy of the products by price
+    def setup(products, rng):
+        def run():
+            sort(list(products))
+            return {}
+        return run
+    return setup
+
+
+def _queries(values: Sequence, rng: np.random.Generator, count: int,
+             miss: Callable = lambda value: value + 0.005) -> List:
+    # Pick lookup keys: half present in the data, half changed by miss so they are usually absent
+    picked = rng.choice(np.asarray(values), min(count, len(values))).tolist()
+    return [value if i % 2 == 0 else miss(value) for i, value in enumerate(picked)]
+
+
+def _id_queries(products: List[Product], rng: np.random.Generator) -> List[int]:
+    # Product IDs to look up; negated IDs are never present
+    return _queries([p.product_id for p in products], rng, QUERY_COUNT, miss=lambda value: -value)
+
+
+def _manager(products: List[Product]) -> BasicProductManager:
+    manager = BasicProductManager()
+    manager.add_products(products)
+    return manager
+
+
+def _binary_search(products, rng):
+    manager = _manager(products)
+    queries = _id_queries(products, rng)
+    manager.binary_search(queries[0])  # Build the sorted ID cache outside the timed run
+
+    def run():
+        return {"queries": len(queries), "found": sum(manager.binary_search(q) is not None for q in queries)}
+    return run
+
+
+def _binary_search_many(products, rng):
+    manager = _manager(products)
+    queries = _id_queries(products, rng)
+    manager.binary_search_many(queries[:1])  # Build the sorted ID arrays outside the timed run
+
+    def run():
+        return {"queries": len(queries), "found": sum(p is not None for p in manager.binary_search_many(queries))}
+    return run
+
+
+def _interpolation_search(products, rng):
+    manager = _manager(products)
+    queries = _queries([p.price for p in products], rng, QUERY_COUNT)
+    manager.secondary_index("price")
+
+    def run():
+        return {"queries": len(queries), "found": sum(manager.interpolation_search(q) is not None for q in queries)}
+    return run
+
+
+def _exponential_search(products, rng):
+    by_rating = sorted(products, key=lambda p: p.rating)
+    queries = _queries([p.rating for p in products], rng, QUERY_COUNT)
+
+    def run():
+        return {"queries": len(queries), "found": sum(exponential_search(by_rating, q) is not None for q in queries)}
+    return run
+
+
+def _exponential_search_many(products, rng):
+    by_rating = sorted(products, key=lambda p: p.rating)
+    queries = _queries([p.rating for p in products], rng, QUERY_COUNT)
+
+    def run():
+        found = exponential_search_many(by_rating, queries)
+        return {"queries": len(queries), "found": sum(p is not None for p in found)}
+    return run
+
+
+def _hash_table(factory: Callable[[int], object], found: Callable[[object], bool]) -> Setup:
+    # Time inserting every product into a fresh table and then looking up a sample of IDs
+    def setup(products, rng):
+        queries = _id_queries(products, rng)
+
+        def run():
+            table = factory(len(products))
+            for product in products:
+                table.insert(product.product_id, product.product_name)
+            hits = sum(found(table.search(q)) for q in queries)
+            return {"found": hits, **table.counters()}
+        return run
+    return setup
+
+
+def _mst(method: str) -> Setup:
+    # Time one spanning-tree algorithm on the supplier graph built from the products
+    def setup(products, rng):
+        graph = SupplierGraph.from_products(products)
+        edges = sum(len(neighbours) for neighbours in graph.graph.values()) // 2
+
+        def run():
+            tree = getattr(graph, method)()
+            return {"suppliers": len(graph.suppliers), "edges": edges, "tree_edges": len(tree)}
+        return run
+    return setup
+
+
+# name -> (setup, largest size it is run at); quadratic algorithms stop early
+BENCHMARKS: Dict[str, Tuple[Setup, int]] = {
+    "bubble_sort": (_sorting(lambda items: bubble_sort(items, _price)), 2_000),
+    "merge_sort": (_sorting(lambda items: merge_sort(items, _price)), 1_000_000),
+    "quick_sort": (_sorting(lambda items: quick_sort(items, _price)), 1_000_000),
+    "timsort": (_sorting(lambda items: sort_products(items, "price", strategy="timsort")), 1_000_000),
+    "lexsort": (_sorting(lambda items: sort_products(items, "price", strategy="lexsort")), 1_000_000),
+    "k_way_merge_sort": (_sorting(lambda items: k_way_merge_sort(items, 4, key=_price)), 1_000_000),
+    "binary_search": (_binary_search, 1_000_000),
+    "interpolation_search": (_interpolation_search, 1_000_000),
+    "exponential_search": (_exponential_search, 1_000_000),
+    "binary_search_many": (_binary_search_many, 1_000_000),
+    "exponential_search_many": (_exponential_search_many, 1_000_000),
+    "hash_chaining": (_hash_table(HashTableChaining, lambda r: r != "Product not found"), 1_000_000),
+    "hash_open_addressing": (
+        _hash_table(lambda n: HashTableOpenAddressing(2 * n), lambda r: r != "Product not found"), 1_000_000),
+    "hash_robin_hood": (_hash_table(lambda n: RobinHoodHashTable(), lambda r: r is not None), 1_000_000),
+    "prim_mst": (_mst("prim_mst"), 100_000),
+    "kruskal_mst": (_mst("kruskal_mst"), 100_000),
+}
+
+
+def run_benchmark(name: str, products: List[Product], repeat: int = 3, seed: int = 0,
+                  measure_memory: bool = True) -> Dict:
+    # Run one benchmark: best wall time over repeat runs, then one traced run for peak memory
+    setup, _ = BENCHMARKS[name]
+    best = float("inf")
+    counters: Dict[str, int] = {}
+    for _ in range(repeat):
+        run = setup(products, np.random.default_rng(seed))
+        start = time.perf_counter()
+        counters = run()
+        best = min(best, time.perf_counter() - start)
+    peak = None
+    if measure_memory:
+        run = setup(products, np.random.default_rng(seed))
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak, "counters": counters}
+
+
+def run_suite(sizes: Sequence[int] = DEFAULT_SIZES, distributions: Sequence[str] = DISTRIBUTIONS,
+              benchmarks: Optional[Sequence[str]] = None, repeat: int = 3, seed: int = 0,
+              measure_memory: bool = True, progress: Optional[Callable[[Dict], None]] = None,
+              time_budget: float = TIME_BUDGET) -> List[Dict]:
+    # Sweep every benchmark over every size and distribution it supports, smallest sizes first.
+    # A benchmark that exceeds time_budget on a distribution (e.g. quadratic probing on clustered
+    # IDs) is recorded as skipped for the larger sizes instead of running for hours
+    names = list(benchmarks or BENCHMARKS)
+    over_budget = set()
+    results = []
+    for size in sorted(sizes):
+        for distribution in distributions:
+            products = make_products(size, distribution, seed)
+            for name in names:
+                if size > BENCHMARKS[name][1]:
+                    continue
+                result = {"benchmark": name, "distribution": distribution, "size": size}
+                if (name, distribution) in over_budget:
+                    result.update({"seconds": None, "peak_bytes": None, "counters": {}, "skipped": True})
+                else:
+                    result.update(run_benchmark(name, products, repeat, seed, measure_memory))
+                    if result["seconds"] > time_budget:
+                        over_budget.add((name, distribution))
+                results.append(result)
+                if progress:
+                    progress(result)
+    return results
+
+
+def _key(result: Dict) -> Tuple[str, str, int]:
+    return result["benchmark"], result["distribution"], result["size"]
+
+
+def find_regressions(results: List[Dict], baseline: List[Dict], threshold: float = DEFAULT_THRESHOLD,
+                     min_seconds: float = MIN_SECONDS) -> List[Dict]:
+    # Compare results with a stored baseline; report every time or peak memory that grew by more than threshold
+    previous = {_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(_key(result))
+        if old is None or result.get("skipped") or old.get("skipped"):
+            continue
+        checks = [("seconds", max(old["seconds"], min_seconds))]
+        if result.get("peak_bytes") and old.get("peak_bytes"):
+            checks.append(("peak_bytes", old["peak_bytes"]))
+        for metric, reference in checks:
+            ratio = result[metric] / reference
+            if ratio > threshold:
+                regressions.append({
+                    "benchmark": result["benchmark"], "distribution": result["distribution"],
+                    "size": result["size"], "metric": metric,
+                    "baseline": old[metric], "current": result[metric], "ratio": ratio,
+                })
+    return regressions
+
+
+def _format(result: Dict) -> str:
+    if result.get("skipped"):
+        return f"{result['benchmark']:<25}{result['distribution']:<12}{result['size']:>9}     skipped (over time budget)"
+    peak = "-" if result["peak_bytes"] is None else f"{result['peak_bytes'] / 1024:.0f} KiB"
+    counters = ", ".join(f"{k}={v}" for k, v in result["counters"].items())
+    return (f"{result['benchmark']:<25}{result['distribution']:<12}{result['size']:>9}"
+            f"{result['seconds'] * 1000:>12.3f} ms{peak:>14}  {counters}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the search, sort, hash table and graph implementations.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--distributions", nargs="+", choices=DISTRIBUTIONS, default=list(DISTRIBUTIONS))
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark; the best is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-budget", type=float, default=TIME_BUDGET,
+                        help="seconds after which larger sizes of a benchmark/distribution are skipped")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run for peak memory")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="flag results slower or larger than baseline by this factor")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.sizes, args.distributions, args.benchmarks, args.repeat, args.seed,
+                        not args.no_memory, progress=lambda result: print(_format(result), flush=True),
+                        time_budget=args.time_budget)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = find_regressions(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression['benchmark']} {regression['distribution']} n={regression['size']} "
+                  f"{regression['metric']}: {regression['baseline']:.6g} -> {regression['current']:.6g} "
+                  f"({regression['ratio']:.2f}x)")
+        if regressions:
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
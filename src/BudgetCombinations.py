@@ -0,0 +1,134 @@
+import heapq
+import math
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from Product import Product
+
+Combination = Tuple[Tuple[Product, ...], float]
+
+# Named objectives for best_combination_within_budget
+VALUE_FUNCTIONS = {
+    "profit": lambda p: p.price * p.profit_margin / 100,
+    "sales": lambda p: p.sales_volume,
+}
+
+
+def iter_combinations_within_budget(products: Sequence[Product], budget: float) -> Iterator[Combination]:
+    # Lazily yield every combination (in backtracking order, starting with the empty one) whose
+    # total price is within budget. An explicit stack replaces recursion and the current path is
+    # shared, so a tuple is only built for combinations that are actually yielded
+    prices = [p.price for p in products]
+    n = len(prices)
+    # suffix_min[i] is the cheapest price from position i on; it prunes branches where nothing fits
+    suffix_min = [math.inf] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        suffix_min[i] = min(prices[i], suffix_min[i + 1])
+
+    if budget < 0:
+        return
+    path: List[Product] = []
+    totals = [0.0]  # running total for each depth, so no floating-point error accumulates on backtrack
+    next_index = [0]  # next candidate position for each depth
+    yield (), 0.0
+    while next_index:
+        i, total = next_index[-1], totals[-1]
+        if total + suffix_min[i] > budget:
+            i = n
+        while i < n and total + prices[i] > budget:
+            i += 1
+        if i >= n:
+            # No candidate left at this depth: backtrack
+            next_index.pop()
+            totals.pop()
+            if path:
+                path.pop()
+            continue
+        next_index[-1] = i + 1
+        path.append(products[i])
+        totals.append(total + prices[i])
+        next_index.append(i + 1)
+        yield tuple(path), totals[-1]
+
+
+def _price_units(products: Sequence[Product], budget: float, scale: int) -> Tuple[List[int], int]:
+    # Convert prices and budget to integer units (cents for scale=100) for dynamic programming
+    weights = [int(round(p.price * scale)) for p in products]
+    capacity = int(math.floor(budget * scale + 1e-9))
+    return weights, capacity
+
+
+def count_combinations_within_budget(products: Sequence[Product], budget: float, scale: int = 100) -> int:
+    # Count the combinations within budget (including the empty one) with a DP over budget units,
+    # in O(n * budget * scale) time instead of enumerating every subset
+    weights, capacity = _price_units(products, budget, scale)
+    if capacity < 0:
+        return 0
+    # ways[c] = number of subsets whose total is exactly c units; Python ints once counts can exceed int64
+    ways = np.zeros(capacity + 1, dtype=np.int64 if len(weights) < 63 else object)
+    ways[0] = 1
+    for w in weights:
+        if w == 0:
+            ways = ways * 2
+        elif w <= capacity:
+            ways[w:] = ways[w:] + ways[:capacity + 1 - w]
+    return int(ways.sum())
+
+
+def best_combination_within_budget(products: Sequence[Product], budget: float,
+                                   value: Union[str, Callable[[Product], float]] = "profit",
+                                   scale: int = 100) -> Combination:
+    # Pick the subset maximizing total value (profit, sales or any callable) with a 0/1 knapsack DP.
+    # Returns the chosen products and their total price
+    if callable(value):
+        value_of = value
+    elif value in VALUE_FUNCTIONS:
+        value_of = VALUE_FUNCTIONS[value]
+    else:
+        value_of = lambda p: getattr(p, value)
+    weights, capacity = _price_units(products, budget, scale)
+    if capacity < 0:
+        return (), 0.0
+    # best[c] = best value with total price at most c units
+    best = np.zeros(capacity + 1, dtype=np.float64)
+    # One packed bit row per product records whether taking it improved best[c]
+    taken = []
+    for product, w in zip(products, weights):
+        v = value_of(product)
+        if w > capacity or v <= 0:
+            taken.append(None)
+            continue
+        candidate = best[:capacity + 1 - w] + v
+        improved = candidate > best[w:]
+        best[w:] = np.where(improved, candidate, best[w:])
+        row = np.zeros(capacity + 1, dtype=bool)
+        row[w:] = improved
+        taken.append(np.packbits(row))
+
+    # Walk the decisions backwards to recover the chosen subset
+    chosen = []
+    c = capacity
+    for i in range(len(products) - 1, -1, -1):
+        bits = taken[i]
+        if bits is not None and (bits[c >> 3] >> (7 - (c & 7))) & 1:
+            chosen.append(products[i])
+            c -= weights[i]
+    chosen.reverse()
+    return tuple(chosen), sum(p.price for p in chosen)
+
+
+def top_combinations_within_budget(products: Sequence[Product], budget: float, n: int = 10,
+                                   key: Optional[Callable[[Combination], float]] = None,
+                                   max_results: Optional[int] = None) -> List[Combination]:
+    # Return the n best combinations by key (default: total price, i.e. closest to the budget),
+    # examining at most max_results combinations so the query cost is capped
+    key = key or (lambda combination: combination[1])
+    heap: List[Tuple[float, int, Combination]] = []
+    for examined, combination in enumerate(iter_combinations_within_budget(products, budget)):
+        if max_results is not None and examined >= max_results:
+            break
+        item = (key(combination), -examined, combination)
+        if len(heap) < n:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    return [combination for _, _, combination in sorted(heap, reverse=True)]
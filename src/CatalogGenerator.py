@@ -0,0 +1,151 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from Product import Product
+from ProductStore import ColumnarProductStore, PRODUCT_FIELDS
+from SupplierGraph import SupplierGraph
+
+BASE_CATEGORIES = (
+    "Electronics", "Apparel", "Home Appliances", "Books", "Toys", "Garden", "Sports", "Beauty",
+    "Grocery", "Automotive", "Office", "Pet Supplies", "Jewelry", "Music", "Health", "Furniture",
+)
+SEGMENTS = ("Premium", "Retail", "Wholesale")
+SEGMENT_WEIGHTS = (0.2, 0.6, 0.2)
+DISCOUNTS = np.array([0, 5, 10, 15, 20, 25, 30])
+
+DEFAULT_BATCH_SIZE = 100_000
+# Supplier IDs are drawn without replacement from [1, SUPPLIER_ID_SPACE), so they are sparse
+SUPPLIER_ID_SPACE = 10_000_000
+
+
+def _zipf_weights(n: int, exponent: float) -> np.ndarray:
+    # Popularity weights 1/rank^exponent, normalized to sum to 1
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+class CatalogGenerator:
+    def __init__(self, seed: int = 0, n_suppliers: int = 1_000, n_categories: int = 50,
+                 start_id: int = 1, zipf_exponent: float = 1.8):
+        # Seeded generator of realistic catalogs. The supplier population (sparse IDs, categories
+        # offered, premium flag) is fixed up front so every batch and the supplier graph agree
+        self.rng = np.random.default_rng(seed)
+        self.next_id = start_id
+        self.zipf_exponent = zipf_exponent
+        self.categories = list(BASE_CATEGORIES[:n_categories])
+        self.categories += [f"Category {i}" for i in range(len(self.categories), n_categories)]
+        category_weights = _zipf_weights(n_categories, 1.1)
+        # Typical log-price per category, so each category has its own price level
+        self.category_log_price = self.rng.normal(3.8, 0.9, n_categories)
+
+        self.supplier_ids = np.sort(self.rng.choice(np.arange(1, SUPPLIER_ID_SPACE), n_suppliers, replace=False))
+        self.supplier_weights = _zipf_weights(n_suppliers, 1.0)[self.rng.permutation(n_suppliers)]
+        self.premium = self.rng.random(n_suppliers) < 0.25
+        # Each supplier offers 1 + Poisson(2) categories, picked by category popularity
+        offered = np.minimum(1 + self.rng.poisson(2.0, n_suppliers), n_categories)
+        self.supplier_category_counts = offered
+        self.supplier_categories = np.full((n_suppliers, int(offered.max())), -1, dtype=np.int64)
+        for supplier, count in enumerate(offered.tolist()):
+            self.supplier_categories[supplier, :count] = self.rng.choice(
+                n_categories, count, replace=False, p=category_weights)
+
+    def columns(self, n: int) -> Dict[str, np.ndarray]:
+        # Generate the next n products as one array per Product field (ready for extend_columns)
+        rng = self.rng
+        ids = np.arange(self.next_id, self.next_id + n, dtype=np.int64)
+        self.next_id += n
+
+        supplier = rng.choice(len(self.supplier_ids), n, p=self.supplier_weights)
+        pick = (rng.random(n) * self.supplier_category_counts[supplier]).astype(np.int64)
+        category = self.supplier_categories[supplier, pick]
+
+        # A latent quality score ties ratings, reviews and return rates together
+        quality = rng.normal(0.0, 1.0, n)
+        sales_volume = np.minimum(rng.zipf(self.zipf_exponent, n) * 10 + rng.integers(0, 10, n), 1_000_000)
+        rating = np.clip(np.round(4.0 + 0.5 * quality + rng.normal(0, 0.3, n), 1), 1.0, 5.0)
+        reviews = rng.poisson(sales_volume * 0.3 * (1 + 0.2 * np.clip(quality, -2, 2)))
+        return_rate = np.clip(np.round(3.0 - 0.8 * quality + rng.normal(0, 0.5, n), 1), 0.0, 25.0)
+        price = np.round(np.exp(self.category_log_price[category] + rng.normal(0, 0.6, n)), 2)
+
+        category_labels = np.asarray(self.categories, dtype=object)[category]
+        return {
+            "product_id": ids,
+            "product_name": np.asarray([f"{label} {i}" for label, i in zip(category_labels.tolist(), ids.tolist())],
+                                       dtype=object),
+            "category": category_labels,
+            "price": np.maximum(price, 0.99),
+            "stock": rng.poisson(120, n).astype(np.int64),
+            "discount": rng.choice(DISCOUNTS, n).astype(np.float64),
+            "rating": rating,
+            "reviews": reviews.astype(np.int64),
+            "sales_volume": sales_volume.astype(np.int64),
+            "return_rate": return_rate,
+            "supplier_id": self.supplier_ids[supplier],
+            "shipping_time": np.clip(rng.poisson(4, n) + 1, 1, 30).astype(np.int64),
+            "is_premium_supplier": self.premium[supplier],
+            "customer_segment": np.asarray(SEGMENTS, dtype=object)[rng.choice(len(SEGMENTS), n, p=SEGMENT_WEIGHTS)],
+            "purchase_frequency": rng.poisson(5, n).astype(np.int64) + 1,
+            "profit_margin": np.clip(np.round(rng.normal(22, 6, n), 1), 1.0, 60.0),
+            "last_restocked_date": np.datetime64("2024-12-31", "D") - rng.integers(0, 730, n).astype("timedelta64[D]"),
+        }
+
+    def batches(self, n: int, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Dict[str, np.ndarray]]:
+        # Generate n products as column batches of at most batch_size rows
+        for start in range(0, n, batch_size):
+            yield self.columns(min(batch_size, n - start))
+
+    def store(self, n: int, batch_size: int = DEFAULT_BATCH_SIZE) -> ColumnarProductStore:
+        # Generate n products straight into a columnar store, batch by batch
+        store = ColumnarProductStore(initial_capacity=n)
+        for batch in self.batches(n, batch_size):
+            store.extend_columns(batch)
+        return store
+
+    def products(self, n: int) -> List[Product]:
+        # Generate n products as Product records
+        return ColumnarProductStore.from_columns(self.columns(n)).to_products()
+
+    def write_csv(self, path: str, n: int, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        # Stream n products to a CSV file in the layout read by CatalogLoader, one batch in memory at a time
+        for i, batch in enumerate(self.batches(n, batch_size)):
+            frame = pd.DataFrame(batch, columns=PRODUCT_FIELDS)
+            frame.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        return n
+
+    def supplier_category_pairs(self) -> List[Tuple[int, str]]:
+        # Every (supplier_id, category) the suppliers offer; the input SupplierGraph.add_product expects
+        pairs = []
+        for supplier_id, row, count in zip(self.supplier_ids.tolist(), self.supplier_categories.tolist(),
+                                           self.supplier_category_counts.tolist()):
+            pairs.extend((supplier_id, self.categories[category]) for category in row[:count])
+        return pairs
+
+    def supplier_graph(self) -> SupplierGraph:
+        # Build the supplier graph for the whole supplier population
+        graph = SupplierGraph()
+        for supplier_id, category in self.supplier_category_pairs():
+            graph.add_product(supplier_id, category)
+        graph.create_graph()
+        return graph
+
+
+def generate_store(n: int, seed: int = 0, n_suppliers: Optional[int] = None,
+                   batch_size: int = DEFAULT_BATCH_SIZE) -> ColumnarProductStore:
+    # Convenience wrapper: a reproducible columnar catalog of n products
+    generator = CatalogGenerator(seed, n_suppliers or max(10, n // 200))
+    return generator.store(n, batch_size)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a synthetic product catalog CSV.")
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--suppliers", type=int, default=1_000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+    CatalogGenerator(args.seed, args.suppliers, args.categories).write_csv(args.path, args.rows, args.batch_size)
+    print(f"Wrote {args.rows} products to {args.path}")
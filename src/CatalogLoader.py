@@ -0,0 +1,85 @@
+from typing import Dict, Iterator, List, Union
+import numpy as np
+import pandas as pd
+from Product import Product
+from ProductStore import PRODUCT_FIELDS
+from BasicProductManager import BasicProductManager
+from DynamicProductManager import DynamicProductManager
+
+# CSV column types; string columns are read as objects and last_restocked_date is parsed separately
+CSV_DTYPES = {
+    "product_id": "int64",
+    "product_name": object,
+    "category": object,
+    "price": "float64",
+    "stock": "int64",
+    "discount": "float64",
+    "rating": "float64",
+    "reviews": "int64",
+    "sales_volume": "int64",
+    "return_rate": "float64",
+    "supplier_id": "int64",
+    "shipping_time": "int64",
+    "is_premium_supplier": "bool",
+    "customer_segment": object,
+    "purchase_frequency": "int64",
+    "profit_margin": "float64",
+}
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def iter_catalog_chunks(path: str, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    # Stream a product CSV as DataFrames of at most chunksize rows, so memory stays bounded
+    reader = pd.read_csv(
+        path,
+        usecols=PRODUCT_FIELDS,
+        dtype=CSV_DTYPES,
+        parse_dates=["last_restocked_date"],
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        yield chunk[PRODUCT_FIELDS]
+
+
+def chunk_to_columns(chunk: pd.DataFrame) -> Dict[str, np.ndarray]:
+    # Convert a parsed chunk into one NumPy array per Product field
+    columns = {name: chunk[name].to_numpy() for name in PRODUCT_FIELDS}
+    for name in ("product_name", "category", "customer_segment"):
+        columns[name] = chunk[name].to_numpy(dtype=object)
+    columns["last_restocked_date"] = chunk["last_restocked_date"].to_numpy(dtype="datetime64[D]")
+    return columns
+
+
+def chunk_to_products(chunk: pd.DataFrame) -> List[Product]:
+    # Convert a parsed chunk into Product records with native Python values and date objects
+    values = [chunk[name].tolist() for name in PRODUCT_FIELDS[:-1]]
+    dates = chunk["last_restocked_date"]
+    values.append([None if pd.isna(d) else d.date() for d in dates])
+    return [Product(*row) for row in zip(*values)]
+
+
+def iter_product_batches(path: str, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[List[Product]]:
+    # Stream a product CSV as lists of Product records
+    for chunk in iter_catalog_chunks(path, chunksize):
+        yield chunk_to_products(chunk)
+
+
+def load_catalog_csv(path: str, manager: Union[BasicProductManager, DynamicProductManager],
+                     chunksize: int = DEFAULT_CHUNKSIZE) -> int:
+    # Load a CSV catalog into a manager chunk by chunk and return the number of rows loaded.
+    # Store-backed managers receive column arrays directly; others receive Product batches
+    loaded = 0
+    for chunk in iter_catalog_chunks(path, chunksize):
+        if isinstance(manager, BasicProductManager) and manager.is_columnar:
+            manager.add_columns(chunk_to_columns(chunk))
+        else:
+            manager.add_products(chunk_to_products(chunk))
+        loaded += len(chunk)
+    return loaded
+
+
+def write_catalog_csv(path: str, products: List[Product]):
+    # Write products in the CSV layout read by load_catalog_csv
+    frame = pd.DataFrame([[getattr(p, name) for name in PRODUCT_FIELDS] for p in products], columns=PRODUCT_FIELDS)
+    frame.to_csv(path, index=False)
@@ -0,0 +1,322 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+from Product import Product
+from ProductStore import ColumnarProductStore
+from BasicProductManager import BasicProductManager
+from SortedIndex import SliceView, INDEXED_FIELDS
+from Instrumentation import SynchronizedInstrumentation, get_logger
+
+logger = get_logger("ConcurrentProductManager")
+
+# Indexes every published version has ready before readers can see it
+DEFAULT_INDEXES = ("ids",)
+
+
+class WriteBatch:
+    def __init__(self):
+        # Queued writes, applied in order and all-or-nothing by ConcurrentProductManager.apply
+        self.operations: List[Tuple[str, tuple, dict]] = []
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    def add_product(self, product: Product):
+        self.operations.append(("add_product", (product,), {}))
+
+    def add_products(self, products: Iterable[Product]):
+        self.operations.append(("add_products", (list(products),), {}))
+
+    def update_product(self, product_id: int, **updates):
+        self.operations.append(("update_product", (product_id,), updates))
+
+    def delete_product(self, product_id: int):
+        self.operations.append(("delete_product", (product_id,), {}))
+
+
+class _Version:
+    def __init__(self, manager: BasicProductManager, number: int, indexes: Set[str]):
+        # One published, never-modified catalog state and the indexes already built on it
+        self.manager = manager
+        self.number = number
+        self.indexes = indexes
+
+
+class _CatalogReads:
+    def _reader(self, *indexes: str) -> BasicProductManager:
+        # A published version with the given indexes built: the current one for the catalog, the pinned
+        # one for a snapshot. The reads below, shared by both, never modify it
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return len(self._reader().products)
+
+    @property
+    def products(self) -> ColumnarProductStore:
+        # The version's product columns; never modify them, other threads may be reading them
+        return self._reader().products
+
+    @property
+    def is_columnar(self) -> bool:
+        return self._reader().is_columnar
+
+    def get_product(self, product_id: int) -> Optional[Product]:
+        return self._reader("ids").get_product(product_id)
+
+    def get_products(self, product_ids: Sequence[int]) -> List[Optional[Product]]:
+        # Batched lookup, aligned with product_ids, None where an ID is not found
+        return self._reader("ids").binary_search_many(product_ids)
+
+    def binary_search(self, product_id: int) -> Optional[Product]:
+        return self._reader("ids").binary_search(product_id)
+
+    def linear_search(self, product_name: str) -> Optional[Product]:
+        return self._reader("ids", "names").linear_search(product_name)
+
+    def prefix_search(self, prefix: str, limit: Optional[int] = None) -> List[Product]:
+        return self._reader("ids", "names").prefix_search(prefix, limit)
+
+    def fuzzy_search(self, query: str, limit: int = 10, min_similarity: float = 0.3) -> List[Product]:
+        return self._reader("ids", "names").fuzzy_search(query, limit, min_similarity)
+
+    def range_query(self, field: str, low=None, high=None, limit: Optional[int] = None) -> List[Product]:
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Field {field} is not indexed; choose one of {INDEXED_FIELDS}.")
+        return self._reader("ids", field).range_query(field, low, high, limit)
+
+    def range_view(self, field: str, low=None, high=None) -> SliceView:
+        # Lazy view of the products with low <= field <= high, bound to the version it was taken from
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Field {field} is not indexed; choose one of {INDEXED_FIELDS}.")
+        return self._reader("ids", field).range_view(field, low, high)
+
+    def find_by_rating(self, rating: float) -> Optional[Product]:
+        return self._reader("ids", "rating").find_by_rating(rating)
+
+    def interpolation_search(self, price: float, tolerance: float = 0.0) -> Optional[Product]:
+        return self._reader("ids", "price").interpolation_search(price, tolerance)
+
+    def filter_products(self, **conditions) -> List[Product]:
+        return self._reader().filter_products(**conditions)
+
+    def sorted_products(self, key: Union[str, Sequence[str]] = "price",
+                        descending: Union[bool, Sequence[bool]] = False) -> List[Product]:
+        # Sorted copy of the products; shared storage is never reordered, so there is no in-place sort
+        return self._reader().sorted_products(key, descending)
+
+    def calculate_total_revenue(self) -> float:
+        return self._reader("revenue").calculate_total_revenue()
+
+    def revenue_by(self, field: str) -> Dict:
+        return self._reader("revenue").revenue_by(field)
+
+
+class CatalogSnapshot(_CatalogReads):
+    def __init__(self, catalog: "ConcurrentProductManager", version: _Version):
+        # Read-only view pinned to one published version, for running several reads against one
+        # consistent state while writes go on
+        self._catalog = catalog
+        self._version = version
+
+    @property
+    def version(self) -> int:
+        return self._version.number
+
+    def _reader(self, *indexes: str) -> BasicProductManager:
+        # The pinned version with the given indexes built, as an equivalent version over the same data
+        # when they were missing; the published manager itself is never modified
+        version = self._version
+        if any(index not in version.indexes for index in indexes):
+            self._version = version = self._catalog._with_indexes(version, indexes)
+        return version.manager
+
+
+class ConcurrentProductManager(_CatalogReads):
+    def __init__(self, store: Optional[ColumnarProductStore] = None,
+                 metrics: Optional[SynchronizedInstrumentation] = None):
+        # Thread-safe catalog built on copy-on-write versions. Readers pick up the current version with a
+        # single attribute read and never lock or modify it; writers serialize on a lock, apply a whole
+        # batch to a private copy and publish it with one reference swap, so readers see every batch
+        # completely or not at all and a long read keeps a consistent view while writes go on.
+        # Every version shares the metrics, which reader threads update concurrently, so they must lock
+        if metrics is not None and not isinstance(metrics, SynchronizedInstrumentation):
+            raise TypeError("Concurrent readers need SynchronizedInstrumentation metrics")
+        self.metrics = metrics or SynchronizedInstrumentation()
+        self._write_lock = threading.Lock()
+        # Indexes requested by readers so far; every new version is published with them already built
+        self._wanted: Set[str] = set(DEFAULT_INDEXES)
+        manager = BasicProductManager(store=store if store is not None else ColumnarProductStore(),
+                                      metrics=self.metrics)
+        manager.build_indexes(*self._wanted)
+        self._current = _Version(manager, 0, set(self._wanted))
+
+    @classmethod
+    def from_products(cls, products: Iterable[Product], metrics: Optional[SynchronizedInstrumentation] = None):
+        # Build a concurrent manager over existing products
+        return cls(ColumnarProductStore.from_products(products), metrics)
+
+    @property
+    def version(self) -> int:
+        # Number of batches published so far; changes whenever readers may see different data
+        return self._current.number
+
+    def snapshot(self) -> CatalogSnapshot:
+        # Read-only view of the current version, for running several reads against one consistent state
+        return CatalogSnapshot(self, self._current)
+
+    def _reader(self, *indexes: str) -> BasicProductManager:
+        # The current version with the given indexes built
+        version = self._current
+        if any(index not in version.indexes for index in indexes):
+            version = self._with_indexes(version, indexes)
+        return version.manager
+
+    def _with_indexes(self, version: _Version, indexes: Sequence[str]) -> _Version:
+        # A version holding the same data as version with the given indexes built. Published versions are
+        # never modified, so missing indexes are built, under the write lock, on a new manager over the
+        # same (unchanging) store. If the version is still current, the result is republished under the
+        # same number and every later version includes the indexes; an older version gets a private copy
+        with self._write_lock:
+            current = self._current
+            if current.number == version.number:
+                version = current
+            if all(index in version.indexes for index in indexes):
+                return version
+            is_current = version is current
+            if is_current:
+                self._wanted.update(indexes)
+            built = set(self._wanted) if is_current else version.indexes | set(indexes)
+            manager = BasicProductManager(store=version.manager.products, metrics=self.metrics)
+            manager.build_indexes(*built)
+            version = _Version(manager, version.number, built)
+            if is_current:
+                self._current = version
+                logger.debug("Republished version %s with indexes %s.", version.number, sorted(built))
+            return version
+
+    # --- Writes: batched, serialized and published atomically ---
+
+    @contextmanager
+    def batch(self) -> Iterator[WriteBatch]:
+        # Collect writes and apply them as one atomic batch when the block exits without an error
+        batch = WriteBatch()
+        yield batch
+        self.apply(batch)
+
+    def apply(self, batch: WriteBatch) -> int:
+        # Apply every queued write to a private copy of the current version and publish the result.
+        # If any write raises, nothing is published. Returns the new version number
+        if not batch.operations:
+            return self.version
+        with self._write_lock:
+            current = self._current
+            manager = BasicProductManager(store=current.manager.products.copy(), metrics=self.metrics)
+            for method, args, kwargs in batch.operations:
+                getattr(manager, method)(*args, **kwargs)
+            manager.build_indexes(*self._wanted)
+            self._current = _Version(manager, current.number + 1, set(self._wanted))
+        self.metrics.emit("batch_published", version=self._current.number, operations=len(batch))
+        logger.debug("Published version %s with %s writes.", self._current.number, len(batch))
+        return self._current.number
+
+    def add_product(self, product: Product) -> int:
+        # Single writes are one-operation batches; group writes with batch() to copy the catalog once
+        batch = WriteBatch()
+        batch.add_product(product)
+        return self.apply(batch)
+
+    def add_products(self, products: Iterable[Product]) -> int:
+        batch = WriteBatch()
+        batch.add_products(products)
+        return self.apply(batch)
+
+    def update_product(self, product_id: int, **updates) -> int:
+        batch = WriteBatch()
+        batch.update_product(product_id, **updates)
+        return self.apply(batch)
+
+    def delete_product(self, product_id: int) -> int:
+        batch = WriteBatch()
+        batch.delete_product(product_id)
+        return self.apply(batch)
+
+
+def stress_test(n_products: int = 100_000, reader_counts: Sequence[int] = (1, 2, 4, 8), seconds: float = 2.0,
+                lookup_batch: int = 256, write_interval: float = 0.05, write_batch: int = 100,
+                seed: int = 0) -> List[Dict]:
+    # Measure read throughput for each number of reader threads while one writer publishes a batch
+    # every write_interval seconds. Readers check that each version they see is internally consistent
+    import time
+    import numpy as np
+    from CatalogGenerator import CatalogGenerator
+
+    generator = CatalogGenerator(seed, n_suppliers=max(10, n_products // 200))
+    manager = ConcurrentProductManager(generator.store(n_products))
+    results = []
+    for readers in reader_counts:
+        stop = threading.Event()
+        reads = [0] * readers
+        errors: List[BaseException] = []
+
+        def read(slot: int):
+            rng = np.random.default_rng(seed + slot)
+            try:
+                while not stop.is_set():
+                    snapshot = manager.snapshot()
+                    ids = rng.integers(1, generator.next_id, lookup_batch)
+                    found = snapshot.get_products(ids)
+                    for product_id, product in zip(ids.tolist(), found):
+                        if product is not None and product.product_id != product_id:
+                            raise AssertionError(f"Lookup of {product_id} returned {product.product_id}")
+                    reads[slot] += lookup_batch
+            except BaseException as error:
+                errors.append(error)
+                stop.set()
+
+        def write():
+            while not stop.wait(write_interval):
+                with manager.batch() as batch:
+                    batch.add_products(generator.products(write_batch))
+                    victim = manager.snapshot().products.column("product_id")[0]
+                    batch.delete_product(int(victim))
+
+        threads = [threading.Thread(target=read, args=(i,)) for i in range(readers)]
+        writer = threading.Thread(target=write)
+        start_version = manager.version
+        start = time.perf_counter()
+        for thread in threads + [writer]:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads + [writer]:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        if errors:
+            raise errors[0]
+        results.append({
+            "readers": readers,
+            "lookups_per_second": sum(reads) / elapsed,
+            "versions_published": manager.version - start_version,
+            "products": len(manager),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stress-test concurrent reads against batched writes.")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--lookup-batch", type=int, default=256)
+    parser.add_argument("--write-interval", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    base = None
+    for result in stress_test(args.products, args.readers, args.seconds, args.lookup_batch,
+                              args.write_interval, seed=args.seed):
+        base = base or result["lookups_per_second"]
+        print(f"{result['readers']:>3} readers: {result['lookups_per_second']:>12,.0f} lookups/s "
+              f"({result['lookups_per_second'] / base:.2f}x), {result['versions_published']} versions published, "
+              f"{result['products']} products")
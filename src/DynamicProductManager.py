@@ -1,190 +1,418 @@
-from typing import List, Optional
+import math
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from itertools import islice
+from operator import attrgetter, itemgetter
 from Product import Product
+from RevenueAggregator import RevenueAggregator
+from SortEngine import sort_products
+from NameIndex import NameIndex
+from SortedIndex import SortedIndex, SliceView, INDEXED_FIELDS
+from InterpolationSearch import interpolation_bound, interpolation_search
+from Snapshot import open_snapshot, save_snapshot
+from Instrumentation import Instrumentation, get_logger, instrumented
+from BudgetCombinations import (
+    iter_combinations_within_budget,
+    count_combinations_within_budget,
+    best_combination_within_budget,
+    top_combinations_within_budget,
+)
+
+# Compact the storage once more than this fraction of the used slots are tombstones
+COMPACT_THRESHOLD = 0.25
+# Capacity is multiplied by this factor whenever the storage is full
+GROWTH_FACTOR = 2.0
+# Shrink the storage once fewer than this fraction of its slots hold live products
+SHRINK_THRESHOLD = 0.25
+
+logger = get_logger("DynamicProductManager")
+_price = attrgetter("price")
+# Search key of a (value, product_id) sorted-index entry
+_entry_value = itemgetter(0)
 
 class DynamicProductManager:
-    def __init__(self, initial_capacity: int = 5):
-        # Initialize the product manager with a specified capacity
+    def __init__(self, initial_capacity: int = 5, compact_threshold: float = COMPACT_THRESHOLD,
+                 growth_factor: float = GROWTH_FACTOR, shrink_threshold: Optional[float] = SHRINK_THRESHOLD,
+                 metrics: Optional[Instrumentation] = None):
+        # Initialize the product manager with a specified capacity and resize policy;
+        # shrink_threshold=None turns automatic shrinking off
+        if growth_factor <= 1:
+            raise ValueError("growth_factor must be greater than 1")
         self.capacity = initial_capacity
+        self.initial_capacity = initial_capacity
+        self.growth_factor = growth_factor
+        self.shrink_threshold = shrink_threshold
+        # Operation counters, latency histograms and event hooks (see Instrumentation)
+        self.metrics = metrics or Instrumentation()
+        # Number of used slots, including tombstones (deleted slots holding None)
         self.size = 0
         # Create a list to store products, initialized with None up to the initial capacity
         self.products: List[Optional[Product]] = [None] * self.capacity
+        # Index mapping product_id to its slot in self.products
+        self._slots: Dict[int, int] = {}
+        self._tombstones = 0
+        self.compact_threshold = compact_threshold
+        # Lazily rebuilt sorted product IDs used by binary_search; None when stale
+        self._sorted_ids: Optional[List[int]] = None
+        # Running revenue totals, built on first use and then maintained incrementally
+        self._revenue: Optional[RevenueAggregator] = None
+        # Case-folded product-name index, built on first use and then maintained incrementally
+        self._names: Optional[NameIndex] = None
+        # Sorted indexes on INDEXED_FIELDS, built on first use and then maintained incrementally
+        self._secondary: Dict[str, SortedIndex] = {}
+
+    def __len__(self) -> int:
+        # Number of live products, not counting tombstones
+        return self.size - self._tombstones
+
+    def __iter__(self) -> Iterator[Product]:
+        # Iterate over the live products in slot order, skipping tombstones
+        for product in self.products[:self.size]:
+            if product is not None:
+                yield product
+
+    @property
+    def revenue(self) -> RevenueAggregator:
+        # Running revenue totals, overall and by category, supplier_id and customer_segment
+        if self._revenue is None or self._revenue.count != len(self):
+            self._revenue = RevenueAggregator.from_products(self.products[:self.size])
+        return self._revenue
+
+    @property
+    def name_index(self) -> NameIndex:
+        # Case-folded name index for exact, prefix and fuzzy name search
+        if self._names is None or len(self._names) != len(self):
+            self._names = NameIndex.build(self)
+        return self._names
 
+    def secondary_index(self, field: str) -> SortedIndex:
+        # Return the sorted index for a field, building it on first use
+        index = self._secondary.get(field)
+        if index is None:
+            if field not in INDEXED_FIELDS:
+                raise ValueError(f"Field {field} is not indexed; choose one of {INDEXED_FIELDS}.")
+            index = self._secondary[field] = SortedIndex.build(field, self)
+        return index
+
+    def revenue_by(self, field: str) -> dict:
+        # Revenue broken down by category, supplier_id or customer_segment
+        return self.revenue.revenue_by(field)
+
+    @instrumented()
     def add_product(self, product: Product):
-        # Add a product to the list, reallocating if capacity is reached
+        # Add a product to the list, reallocating if capacity is reached. A product whose ID is already
+        # stored replaces the old one in its slot
+        slot = self._slots.get(product.product_id)
+        if slot is not None:
+            self._replace(slot, product)
+            self.metrics.emit("product_replaced", product_id=product.product_id)
+            logger.info("Product %s replaced.", product.product_name)
+            return
         if self.size >= self.capacity:
             self._reallocate()
         self.products[self.size] = product
+        self._slots[product.product_id] = self.size
         self.size += 1
-        print(f"Product {product.product_name} added.")
+        self._sorted_ids = None
+        for field, index in self._secondary.items():
+            index.add(getattr(product, field), product.product_id)
+        if self._revenue is not None:
+            self._revenue.add(product)
+        if self._names is not None:
+            self._names.add(product.product_name, product.product_id)
+        self.metrics.emit("product_added", product_id=product.product_id)
+        logger.info("Product %s added.", product.product_name)
+
+    @instrumented()
+    def add_products(self, products: Iterable[Product]):
+        # Add a batch of products with at most one reallocation and no per-item console output.
+        # IDs already stored replace the old product in its slot; within the batch the last one wins
+        products = self._new_products(products)
+        if self.size + len(products) > self.capacity:
+            self._reallocate(self.size + len(products))
+        self.products[self.size:self.size + len(products)] = products
+        self._slots.update((p.product_id, self.size + i) for i, p in enumerate(products))
+        self.size += len(products)
+        self._sorted_ids = None
+        if len(products) * 8 > len(self):
+            # Large batches make a later rebuild cheaper than inserting into the sorted indexes one by one
+            self._secondary = {}
+        for field, index in self._secondary.items():
+            for product in products:
+                index.add(getattr(product, field), product.product_id)
+        if self._revenue is not None:
+            for product in products:
+                self._revenue.add(product)
+        if self._names is not None:
+            for product in products:
+                self._names.add(product.product_name, product.product_id)
+
+    def _new_products(self, products: Iterable[Product]) -> List[Product]:
+        # Replace the stored products whose IDs reappear in a batch, and return the rest of the batch
+        # with one product per new ID
+        fresh: List[Product] = []
+        batch_slots: Dict[int, int] = {}
+        for product in products:
+            slot = self._slots.get(product.product_id)
+            if slot is not None:
+                self._replace(slot, product)
+            elif product.product_id in batch_slots:
+                fresh[batch_slots[product.product_id]] = product
+            else:
+                batch_slots[product.product_id] = len(fresh)
+                fresh.append(product)
+        return fresh
 
+    def _replace(self, slot: int, product: Product):
+        # Store product in place of the one in slot (same ID), keeping the running indexes in step
+        old = self.products[slot]
+        self.products[slot] = product
+        for field, index in self._secondary.items():
+            index.update(getattr(old, field), getattr(product, field), product.product_id)
+        if self._revenue is not None:
+            self._revenue.remove(old)
+            self._revenue.add(product)
+        if self._names is not None:
+            self._names.remove(old.product_id)
+            self._names.add(product.product_name, product.product_id)
+
+    def _live_products(self) -> List[Product]:
+        # Return the stored products in slot order, skipping empty slots
+        return [p for p in self.products[:self.size] if p is not None]
+
+    def get_product(self, product_id: int) -> Optional[Product]:
+        # Return the product with the given ID in O(1) using the slot index
+        slot = self._slots.get(product_id)
+        return self.products[slot] if slot is not None else None
+
+    @instrumented()
     def delete_product(self, product_id: int):
-        # Delete a product by product ID, shifting remaining products down
-        for i in range(self.size):
-            if self.products[i] and self.products[i].product_id == product_id:
-                # Shift elements to fill the gap
-                for j in range(i, self.size - 1):
-                    self.products[j] = self.products[j + 1]
-                # Remove last product reference and reduce size
-                self.products[self.size - 1] = None
-                self.size -= 1
-                print(f"Product with ID {product_id} deleted.")
-                return
-
-    def _reallocate(self):
-        # Double the capacity of the product list when more space is needed
-        self.capacity *= 2
-        new_storage = [None] * self.capacity
-        # Copy old products into new storage with increased capacity
-        for i in range(self.size):
-            new_storage[i] = self.products[i]
-        self.products = new_storage
-        print(f"Reallocated to new capacity: {self.capacity}")
+        # Delete a product in O(1) by leaving a tombstone in its slot; the storage is compacted
+        # once tombstones make up more than compact_threshold of the used slots
+        slot = self._slots.pop(product_id, None)
+        if slot is None:
+            self.metrics.emit("product_not_found", product_id=product_id)
+            return
+        for field, index in self._secondary.items():
+            index.remove(getattr(self.products[slot], field), product_id)
+        if self._revenue is not None:
+            self._revenue.remove(self.products[slot])
+        if self._names is not None:
+            self._names.remove(product_id)
+        self.products[slot] = None
+        self._tombstones += 1
+        self._sorted_ids = None
+        if self._tombstones > self.compact_threshold * self.size:
+            self.compact()
+        if self.shrink_threshold and self.capacity > self.initial_capacity \
+                and len(self) < self.shrink_threshold * self.capacity:
+            # Shrink back to one growth step above the live count, so a few adds do not regrow it at once
+            self.compact()
+            self._resize(max(self.initial_capacity, math.ceil(len(self) * self.growth_factor)))
+        self.metrics.emit("product_deleted", product_id=product_id)
+        logger.info("Product with ID %s deleted.", product_id)
+
+    @instrumented()
+    def compact(self):
+        # Move the live products to the front of the storage, keeping their order, and drop the tombstones
+        live = self._live_products()
+        self.products[:len(live)] = live
+        self.products[len(live):self.size] = [None] * (self.size - len(live))
+        self.size = len(live)
+        self._tombstones = 0
+        self._reindex()
+
+    def _reindex(self):
+        # Rebuild the product_id -> slot index after products were moved
+        self._slots = {p.product_id: slot for slot, p in enumerate(self.products[:self.size]) if p is not None}
+        self._sorted_ids = None
+
+    def _reallocate(self, min_capacity: int = 0):
+        # Grow the capacity by growth_factor (repeatedly, up to min_capacity) when more space is needed
+        capacity = self.capacity
+        while capacity <= self.size or capacity < min_capacity:
+            capacity = max(capacity + 1, int(capacity * self.growth_factor))
+        self._resize(capacity)
+        self.metrics.emit("reallocated", capacity=self.capacity)
+        logger.info("Reallocated to new capacity: %s", self.capacity)
+
+    @instrumented()
+    def _resize(self, capacity: int):
+        # Move the used slots into storage of exactly the given capacity with one slice copy
+        self.products = self.products[:self.size] + [None] * (capacity - self.size)
+        self.capacity = capacity
+
+    @instrumented()
+    def reserve(self, n: int):
+        # Make room for at least n products in one allocation, e.g. before a known bulk load
+        if n > self.capacity:
+            self._resize(max(n, self.size))
+
+    @instrumented()
+    def shrink_to_fit(self):
+        # Compact away tombstones and release every unused slot
+        self.compact()
+        self._resize(self.size)
+
+    def save_snapshot(self, path: str) -> Dict:
+        # Write the live products as a memory-mappable snapshot directory and return its manifest
+        return save_snapshot(self, path)
+
+    @classmethod
+    def load_snapshot(cls, path: str, **kwargs) -> "DynamicProductManager":
+        # Load a snapshot into a new manager sized to hold it. Slots hold Product objects, so every row
+        # is materialized here; use BasicProductManager.open_snapshot for lazy, memory-mapped access
+        store = open_snapshot(path, mode="r")
+        manager = cls(**kwargs)
+        manager.reserve(len(store))
+        manager.add_products(store)
+        return manager
+
+    def memory_usage(self) -> Dict[str, Union[int, float]]:
+        # Report storage use: slot counts, fill ratio and approximate bytes held by the slot list and products
+        storage_bytes = sys.getsizeof(self.products)
+        product_bytes = 0
+        for product in self:
+            product_bytes += sys.getsizeof(product)
+            if hasattr(product, "__dict__"):
+                product_bytes += sys.getsizeof(product.__dict__)
+        return {
+            "capacity": self.capacity,
+            "used_slots": self.size,
+            "live": len(self),
+            "tombstones": self._tombstones,
+            "fill_ratio": len(self) / self.capacity if self.capacity else 0.0,
+            "storage_bytes": storage_bytes,
+            "product_bytes": product_bytes,
+            "total_bytes": storage_bytes + product_bytes,
+        }
     
+    @instrumented()
     def calculate_total_revenue(self, index=0) -> float:
-        # Recursively calculate the total revenue of all products
-        if index >= self.size:
-            return 0
-        # Calculate revenue for the current product, if it exists
-        current_product = self.products[index]
-        current_revenue = current_product.sales_volume * current_product.price if current_product else 0
-        # Recursively add revenue of remaining products
-        return current_revenue + self.calculate_total_revenue(index + 1)
+        # Calculate the total revenue of all products from the running totals in O(1);
+        # a non-zero index sums the products from that slot on in a single loop
+        if index == 0:
+            return self.revenue.total
+        return sum(p.sales_volume * p.price for p in self.products[index:self.size] if p is not None)
     
-    def find_combinations_within_budget(self, budget: float):
-        # Use backtracking to find all product combinations within a given budget
-        def backtrack(start: int, current_combination: List[Product], current_price: float):
-            # Print valid combinations within budget
-            if current_price <= budget:
-                print(f"Valid combination: {[p.product_name for p in current_combination]} - Total Price: {current_price:.2f}")
-            # Add each product to the combination if within budget
-            for i in range(start, self.size):
-                product = self.products[i]
-                if product and current_price + product.price <= budget:
-                    backtrack(i + 1, current_combination + [product], current_price + product.price)
-        
-        # Start backtracking from the first product
-        backtrack(0, [], 0)
+    def find_combinations_within_budget(self, budget: float, limit: Optional[int] = None):
+        # Print product combinations within a given budget, streaming them from the backtracking
+        # generator; limit caps how many are printed
+        combinations = iter_combinations_within_budget(self._live_products(), budget)
+        for combination, total_price in islice(combinations, limit):
+            print(f"Valid combination: {[p.product_name for p in combination]} - Total Price: {total_price:.2f}")
+
+    @instrumented()
+    def count_combinations_within_budget(self, budget: float) -> int:
+        # Count combinations within budget with a DP over budget instead of enumerating them
+        return count_combinations_within_budget(self._live_products(), budget)
+
+    @instrumented()
+    def best_combination_within_budget(self, budget: float, value="profit") -> Tuple[Tuple[Product, ...], float]:
+        # Return the combination within budget maximizing total profit, sales or a custom value
+        return best_combination_within_budget(self._live_products(), budget, value)
+
+    @instrumented()
+    def top_combinations_within_budget(self, budget: float, n: int = 10,
+                                       max_results: Optional[int] = None) -> List[Tuple[Tuple[Product, ...], float]]:
+        # Return the n combinations closest to the budget, examining at most max_results of them
+        return top_combinations_within_budget(self._live_products(), budget, n, max_results=max_results)
         
+    @instrumented()
     def linear_search(self, product_name: str) -> Optional[Product]:
-        # Perform a linear search to find a product by name
-        for product in self.products:
-            if product and product.product_name.lower() == product_name.lower():
-                return product
-        return None
+        # Find a product by name, ignoring case, in O(1) through the name index
+        product_ids = self.name_index.find(product_name)
+        if not product_ids:
+            return None
+        # Among products sharing the name, return the first one in slot order as a scan would
+        return self.get_product(min(product_ids, key=self._slots.get))
+
+    @instrumented()
+    def prefix_search(self, prefix: str, limit: Optional[int] = None) -> List[Product]:
+        # Return products whose name starts with prefix, ignoring case, in name order
+        return [self.get_product(product_id) for product_id in self.name_index.prefix(prefix, limit)]
+
+    @instrumented()
+    def fuzzy_search(self, query: str, limit: int = 10, min_similarity: float = 0.3) -> List[Product]:
+        # Return products whose name approximately matches the query (typos, word order), best first
+        matches = self.name_index.fuzzy(query, limit, min_similarity)
+        return [self.get_product(product_id) for product_id, _ in matches]
 
+    @instrumented()
     def binary_search(self, product_id: int) -> Optional[Product]:
-        # Perform a binary search for a product by product_id after filtering and sorting products
-        self.products = [product for product in self.products if product is not None]  
-        self.products.sort(key=lambda p: p.product_id)  
-        low, high = 0, len(self.products) - 1
+        # Perform a binary search for a product by product_id over the cached sorted IDs of the
+        # live products; the storage itself is never reordered
+        if self._sorted_ids is None:
+            self._sorted_ids = sorted(self._slots)
+        sorted_ids = self._sorted_ids
+        low, high = 0, len(sorted_ids) - 1
         while low <= high:
             mid = (low + high) // 2
-            if self.products[mid].product_id == product_id:
-                return self.products[mid]
-            elif self.products[mid].product_id < product_id:
+            if sorted_ids[mid] == product_id:
+                return self.get_product(product_id)
+            elif sorted_ids[mid] < product_id:
                 low = mid + 1
             else:
                 high = mid - 1
         return None
 
-    def interpolation_search(self, price: float) -> Optional[Product]:
-        # Perform interpolation search for a product by price after filtering and sorting products
-        if not self.products:
-            return None
-        
-        # Filter out None products for sorting
-        valid_products = [product for product in self.products if product is not None]  
-        valid_products.sort(key=lambda p: p.price) 
-        low, high = 0, len(valid_products) - 1
-
-        while low <= high and price >= valid_products[low].price and price <= valid_products[high].price:
-            # Handle single-element case if the search is narrowed down to one
-            if low == high:
-                if valid_products[low].price == price:
-                    return valid_products[low]
-                return None
-            
-            # Calculate estimated position using interpolation formula
-            pos = low + ((high - low) // (valid_products[high].price - valid_products[low].price) * (price - valid_products[low].price))
-            if valid_products[pos].price == price:
-                return valid_products[pos]
-            if valid_products[pos].price < price:
-                low = pos + 1
-            else:
-                high = pos - 1
+    @instrumented()
+    def binary_search_many(self, product_ids: Sequence[int]) -> List[Optional[Product]]:
+        # Resolve many product IDs at once through the slot index; returns one product per ID,
+        # in order, with None where an ID is not in the catalog
+        if hasattr(product_ids, "tolist"):
+            product_ids = product_ids.tolist()
+        slots, products = self._slots, self.products
+        return [products[slots[product_id]] if product_id in slots else None for product_id in product_ids]
 
-        return None 
-    
-    def bubble_sort(self):
-        # Sort the products by price using bubble sort
-        n = self.size
-        for i in range(n):
-            for j in range(0, n-i-1):
-                # Swap products if out of order
-                if self.products[j] and self.products[j+1] and self.products[j].price > self.products[j+1].price:
-                    self.products[j], self.products[j+1] = self.products[j+1], self.products[j]
-        print("Products sorted using Bubble Sort.")
-
-    def merge_sort(self):
-        # Sort the products by price using merge sort
-        self.products = self._merge_sort(self.products[:self.size])
-        print("Products sorted using Merge Sort.")
-
-    def _merge_sort(self, products: List[Optional[Product]]) -> List[Optional[Product]]:
-        # Helper function for merge sort (recursive), excluding None values
-        products = [p for p in products if p is not None]  
-        if len(products) > 1:
-            mid = len(products) // 2
-            left_half = products[:mid]
-            right_half = products[mid:]
-
-            left_half = self._merge_sort(left_half)
-            right_half = self._merge_sort(right_half)
-
-            i = j = k = 0
-            # Merge the sorted halves
-            while i < len(left_half) and j < len(right_half):
-                if left_half[i].price < right_half[j].price:
-                    products[k] = left_half[i]
-                    i += 1
-                else:
-                    products[k] = right_half[j]
-                    j += 1
-                k += 1
-
-            # Add remaining elements from left and right halves
-            while i < len(left_half):
-                products[k] = left_half[i]
-                i += 1
-                k += 1
-            while j < len(right_half):
-                products[k] = right_half[j]
-                j += 1
-                k += 1
-        return products
-
-    def quick_sort(self):
-        # Sort the products by price using quick sort
-        self._quick_sort(0, self.size - 1)
-        print("Products sorted using Quick Sort.")
-
-    def _quick_sort(self, low: int, high: int):
-        # Helper function for quick sort (recursive)
-        if low < high:
-            # Partition the array and sort the partitions
-            pi = self._partition(low, high)
-            self._quick_sort(low, pi - 1)
-            self._quick_sort(pi + 1, high)
-
-    def _partition(self, low: int, high: int) -> int:
-        # Partition function for quick sort using last element as pivot
-        pivot = self.products[high].price
-        i = low - 1
-        for j in range(low, high):
-            # Place smaller elements on the left of the pivot
-            if self.products[j] and self.products[j].price < pivot:
-                i += 1
-                self.products[i], self.products[j] = self.products[j], self.products[i]
-        # Place pivot element in correct position
-        self.products[i + 1], self.products[high] = self.products[high], self.products[i + 1]
-        return i + 1
+    @instrumented()
+    def interpolation_search(self, price: float, tolerance: float = 0.0) -> Optional[Product]:
+        # Perform interpolation search for a product by price over the price index.
+        # Returns the lowest-priced product within tolerance of price (exact by default)
+        entry = interpolation_search(self.secondary_index("price").entries, price, key=_entry_value,
+                                     tolerance=tolerance)
+        return self.get_product(entry[1]) if entry else None
+
+    def range_view(self, field: str, low=None, high=None) -> SliceView:
+        # Live products with low <= field <= high in field order, as a lazy view over the sorted index:
+        # found in O(log n), materialized only as they are read, valid until the catalog changes
+        return self.secondary_index(field).view(low, high, transform=lambda entry: self.get_product(entry[1]))
+
+    def find_all_by_price(self, price: float, tolerance: float = 0.005) -> SliceView:
+        # Lazy view of every live product priced within tolerance of price
+        entries = self.secondary_index("price").entries
+        start = interpolation_bound(entries, price - tolerance, key=_entry_value)
+        stop = interpolation_bound(entries, price + tolerance, key=_entry_value, right=True, low=start)
+        return SliceView(entries, start, stop, transform=lambda entry: self.get_product(entry[1]))
+
+    @instrumented()
+    def sort_products(self, keys: Union[str, Sequence[str]] = "price",
+                      descending: Union[bool, Sequence[bool]] = False, stable: bool = True,
+                      strategy: str = "auto") -> List[Product]:
+        # Reorder the stored products by one or more fields, each ascending or descending, using the
+        # sort engine's strategy; tombstones are compacted away and the capacity is kept
+        ordered = sort_products(self._live_products(), keys, descending, stable, strategy)
+        self.products[:len(ordered)] = ordered
+        self.products[len(ordered):] = [None] * (self.capacity - len(ordered))
+        self.size = len(ordered)
+        self._tombstones = 0
+        self._reindex()
+        return ordered
+
+    @instrumented()
+    def bubble_sort(self, key: Union[str, Sequence[str]] = "price", descending: bool = False):
+        # Sort the products by a field (price by default) using bubble sort
+        self.sort_products(key, descending, strategy="bubble")
+        logger.info("Products sorted using Bubble Sort.")
+
+    @instrumented()
+    def merge_sort(self, key: Union[str, Sequence[str]] = "price", descending: bool = False):
+        # Sort the products by a field (price by default) using stable bottom-up merge sort
+        self.sort_products(key, descending, strategy="merge")
+        logger.info("Products sorted using Merge Sort.")
+
+    @instrumented()
+    def quick_sort(self, key: Union[str, Sequence[str]] = "price", descending: bool = False):
+        # Sort the products by a field (price by default) using median-of-three quick sort
+        self.sort_products(key, descending, stable=False, strategy="quick")
+        logger.info("Products sorted using Quick Sort.")
@@ -1,14 +1,20 @@
-def binary_search(arr, left, right, rating):
+from SortedIndex import SliceView
+
+def _rating(product):
+    # Default search key: the product's rating
+    return product.rating
+
+def binary_search(arr, left, right, rating, key=_rating):
     # Perform a binary search for a product with a specific rating
     while left <= right:
         # Calculate the middle index
         mid = left + (right - left) // 2
         # Check if the middle element matches the desired rating
-        if arr[mid].rating == rating:
+        if key(arr[mid]) == rating:
             return arr[mid]  # Return the found product
         # If the middle element's rating is less than the desired rating,
         # search in the right half of the array
-        elif arr[mid].rating < rating:
+        elif key(arr[mid]) < rating:
             left = mid + 1
         # If the middle element's rating is greater than the desired rating,
         # search in the left half of the array
@@ -17,19 +23,64 @@ def binary_search(arr, left, right, rating):
     # If no product with the desired rating is found, return None
     return None
 
-def exponential_search(products, rating):
-    # Perform an exponential search for a product with a specific rating
-    if len(products) == 0:
-        return None  # Return None if the product list is empty
+def exponential_search(products, rating, key=_rating, tolerance=0.0):
+    # Perform an exponential search for a product with a specific rating;
+    # key extracts the compared value, so any sequence sorted by that key can be searched.
+    # Returns the first product whose key is within tolerance of rating (exact by default), or None
+    position = gallop_left(products, rating - tolerance, 0, key)
+    if position < len(products) and key(products[position]) <= rating + tolerance:
+        return products[position]
+    return None
+
+def exponential_search_range(products, low, high, key=_rating):
+    # All products with low <= key <= high, as a lazy view over the sorted sequence. Galloping from the
+    # front finds the range in O(log i) for a range starting at index i; nothing is copied
+    start = gallop_left(products, low, 0, key)
+    return SliceView(products, start, gallop_right(products, high, start, key))
+
+def _gallop(products, value, start, key, right):
+    # First index at or after start whose key is > value (right) or >= value (left), probing
+    # start + 1, 3, 7, ... before bisecting, so the cost is O(log d) for a boundary d positions past start
+    n = len(products)
+    before = (lambda k: k <= value) if right else (lambda k: k < value)
+    if start >= n or not before(key(products[start])):
+        return start
+    # Invariant: products[low] is before the boundary
+    low, step = start, 1
+    high = start + 1
+    while high < n and before(key(products[high])):
+        low = high
+        step *= 2
+        high = start + step
+    high = min(high, n)
+    # Bisect for the boundary in (low, high]
+    low += 1
+    while low < high:
+        mid = (low + high) // 2
+        if before(key(products[mid])):
+            low = mid + 1
+        else:
+            high = mid
+    return low
 
-    # Check if the first product matches the desired rating
-    if products[0].rating == rating:
-        return products[0]
+def gallop_left(products, value, start=0, key=_rating):
+    # Lower bound: the first index at or after start whose key is >= value
+    return _gallop(products, value, start, key, right=False)
 
-    index = 1
-    # Increase the index exponentially to find the range where the product might exist
-    while index < len(products) and products[index].rating <= rating:
-        index *= 2  # Double the index
+def gallop_right(products, value, start=0, key=_rating):
+    # Upper bound: the first index at or after start whose key is > value
+    return _gallop(products, value, start, key, right=True)
 
-    # Perform binary search on the identified range
-    return binary_search(products, index // 2, min(index, len(products)) - 1, rating)
+def exponential_search_many(products, values, key=_rating, default=None):
+    # Look up many values in one pass over products sorted by key. The queries are visited in sorted
+    # order and each galloping search starts where the previous one stopped, so k lookups cost
+    # O(k log(n / k)) instead of O(k log n). Returns one result per value, aligned with values:
+    # the first product whose key equals the value, or default when there is none
+    values = values.tolist() if hasattr(values, "tolist") else list(values)
+    results = [default] * len(values)
+    position = 0
+    for i in sorted(range(len(values)), key=values.__getitem__):
+        position = gallop_left(products, values[i], position, key)
+        if position < len(products) and key(products[position]) == values[i]:
+            results[i] = products[position]
+    return results
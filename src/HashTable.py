@@ -1,3 +1,29 @@
+class CountingTable:
+    """Probe and collision accounting shared by the hash tables, in the form used by Instrumentation."""
+
+    def counters(self) -> dict:
+        """Current probe and collision counts plus the table size."""
+        return {"probing_count": self.probing_count, "collisions": self.collisions, "size": self.size}
+
+    def publish(self, metrics, prefix: str = "hash_table"):
+        """Add the probe and collision counts to an Instrumentation as prefix.name counters, then reset them."""
+        metrics.increment(f"{prefix}.probing_count", self.probing_count)
+        metrics.increment(f"{prefix}.collisions", self.collisions)
+        self.probing_count = 0
+        self.collisions = 0
+
+    def search_many(self, product_ids, default=None) -> list:
+        """Look up many product IDs in one call; returns one result per ID, in order, with default where
+        an ID is missing. Repeated IDs are probed only once."""
+        if hasattr(product_ids, "tolist"):
+            product_ids = product_ids.tolist()  # NumPy arrays: probe with Python ints
+        found = {}
+        for product_id in product_ids:
+            if product_id not in found:
+                found[product_id] = self._get(product_id, default)
+        return [found[product_id] for product_id in product_ids]
+
+
 class Node:
     def __init__(self, product_id: int, product_name: str):
         """Initialize a node with product ID and product name."""
@@ -6,13 +32,15 @@ class Node:
         self.next = None  # Pointer to the next node in the chain
 
 
-class HashTableChaining:
-    def __init__(self, size: int):
+class HashTableChaining(CountingTable):
+    def __init__(self, size: int, max_load_factor: float = 0.7):
         """Initialize the hash table with a specified size and attributes for collisions and probing."""
         self.size = size
+        self.max_load_factor = max_load_factor  # Average chain length that triggers doubling the buckets
         self.table = [None] * self.size  # Create a list to hold the chains
         self.collisions = 0  # Track the number of collisions
         self.probing_count = 0  # Track the number of probing attempts
+        self.count = 0  # Number of stored products
 
     def _hash(self, product_id: int) -> int:
         """Hash function to calculate the index for the given product ID."""
@@ -20,8 +48,12 @@ class HashTableChaining:
 
     def insert(self, product_id: int, product_name: str):
         """Insert a new product into the hash table, using chaining to handle collisions."""
+        if (self.count + 1) > self.size * self.max_load_factor:
+            # Keep chains short on average by doubling the buckets
+            self._rehash(self.size * 2)
         index = self._hash(product_id)  # Get the index using the hash function
         self.probing_count += 1  # Increment probing attempts for insertion
+        self.count += 1
 
         if not self.table[index]:
             # If no chain exists at the index, insert the new node directly
@@ -37,6 +69,10 @@ class HashTableChaining:
 
     def search(self, product_id: int) -> str:
         """Search for a product by its ID using chaining."""
+        return self._get(product_id, "Product not found")
+
+    def _get(self, product_id: int, default):
+        """Return the product name stored for product_id, or default."""
         index = self._hash(product_id)  # Get the index using the hash function
         self.probing_count += 1  # Increment probing attempts for searching
 
@@ -46,7 +82,43 @@ class HashTableChaining:
                 return current.product_name  # Return product name if found
             current = current.next  # Move to the next node
             self.probing_count += 1  # Count each probing step
-        return "Product not found"  # Return message if not found
+        return default  # Return the not-found marker
+
+    def delete(self, product_id: int) -> bool:
+        """Remove a product from its chain; returns True if it was present."""
+        index = self._hash(product_id)  # Get the index using the hash function
+        previous, current = None, self.table[index]
+        while current:
+            self.probing_count += 1  # Count each probing step
+            if current.product_id == product_id:
+                # Unlink the node from the chain
+                if previous:
+                    previous.next = current.next
+                else:
+                    self.table[index] = current.next
+                self.count -= 1
+                return True
+            previous, current = current, current.next
+        return False
+
+    def _rehash(self, new_size: int):
+        """Redistribute every chained product over new_size buckets, keeping each chain's order."""
+        nodes = []
+        for head in self.table:
+            while head:
+                nodes.append(head)
+                head = head.next
+        self.size = new_size
+        self.table = [None] * self.size
+        tails = [None] * self.size  # Last node of each new chain, so appending stays O(1)
+        for node in nodes:
+            node.next = None
+            index = self._hash(node.product_id)
+            if tails[index]:
+                tails[index].next = node
+            else:
+                self.table[index] = node
+            tails[index] = node
 
     def display(self):
         """Display the contents of the hash table."""
@@ -62,13 +134,20 @@ class HashTableChaining:
                 print(f"Index {i}: " + " -> ".join(products))
 
 
-class HashTableOpenAddressing:
-    def __init__(self, size: int):
+# Marker left in a slot whose product was deleted, so probe sequences running through it stay intact
+_DELETED = object()
+
+
+class HashTableOpenAddressing(CountingTable):
+    def __init__(self, size: int, max_load_factor: float = 0.7):
         """Initialize the hash table with a specified size and attributes for collisions and probing."""
         self.size = size
+        self.max_load_factor = max_load_factor  # Occupancy (tombstones included) that triggers a rehash
         self.table = [None] * self.size  # Create a list to hold the products
         self.collisions = 0  # Track the number of collisions
         self.probing_count = 0  # Track the number of probing attempts
+        self.used = 0  # Slots holding a product or a tombstone
+        self.count = 0  # Slots holding a product
 
     def _hash(self, product_id: int) -> int:
         """Hash function to calculate the index for the given product ID."""
@@ -76,36 +155,229 @@ class HashTableOpenAddressing:
 
     def insert(self, product_id: int, product_name: str):
         """Insert a new product into the hash table, using open addressing to handle collisions."""
+        if (self.used + 1) > self.size * self.max_load_factor:
+            # Linear probing clusters badly as the table fills up, so rehash well before it is full. Grow
+            # only if live products fill over half the limit; otherwise mostly tombstones fill the table,
+            # and dropping them at the same size leaves at least half the limit free
+            grow = (self.count + 1) > self.size * self.max_load_factor / 2
+            self._rehash(self.size * 2 if grow else self.size)
         index = self._hash(product_id)  # Get the index using the hash function
         self.probing_count += 1  # Increment probing attempts for insertion
+        tombstone = None  # First deleted slot seen, reused if the product is not already present
 
         while self.table[index] is not None:
             self.probing_count += 1  # Increment probing attempts
-            if self.table[index][0] == product_id:
+            if self.table[index] is _DELETED:
+                if tombstone is None:
+                    tombstone = index
+            elif self.table[index][0] == product_id:
                 # If the product ID already exists, update the product name
                 self.table[index] = (product_id, product_name)
                 return
             self.collisions += 1  # Collision occurred
             index = (index + 1) % self.size  # Move to the next index (wrap around)
 
-        # Place the new product in the found index
+        # Place the new product in the found index, preferring an earlier tombstone
+        if tombstone is not None:
+            index = tombstone
+        else:
+            self.used += 1
+        self.count += 1
         self.table[index] = (product_id, product_name)
 
+    def delete(self, product_id: int) -> bool:
+        """Replace a product with a tombstone; returns True if it was present."""
+        index = self._hash(product_id)  # Get the index using the hash function
+        for _ in range(self.size):
+            slot = self.table[index]
+            if slot is None:
+                break
+            self.probing_count += 1  # Count each probing step
+            if slot is not _DELETED and slot[0] == product_id:
+                self.table[index] = _DELETED
+                self.count -= 1
+                return True
+            index = (index + 1) % self.size  # Move to the next index (wrap around)
+        return False
+
+    def _rehash(self, new_size: int):
+        """Move every live product into a table of new_size slots, dropping tombstones."""
+        entries = [slot for slot in self.table if slot is not None and slot is not _DELETED]
+        self.size = new_size
+        self.table = [None] * self.size
+        self.used = 0
+        for product_id, product_name in entries:
+            index = self._hash(product_id)
+            while self.table[index] is not None:
+                index = (index + 1) % self.size
+            self.table[index] = (product_id, product_name)
+            self.used += 1
+
     def search(self, product_id: int) -> str:
         """Search for a product by its ID using open addressing."""
+        return self._get(product_id, "Product not found")
+
+    def _get(self, product_id: int, default):
+        """Return the product name stored for product_id, or default."""
         index = self._hash(product_id)  # Get the index using the hash function
         self.probing_count += 1  # Increment probing attempts for searching
 
-        while self.table[index] is not None:
-            if self.table[index][0] == product_id:
-                return self.table[index][1]  # Return product name if found
+        for _ in range(self.size):
+            slot = self.table[index]
+            if slot is None:
+                break
+            if slot is not _DELETED and slot[0] == product_id:
+                return slot[1]  # Return product name if found
             self.probing_count += 1  # Count each probing step
             index = (index + 1) % self.size  # Move to the next index (wrap around)
-        return "Product not found"  # Return message if not found
+        return default  # Return the not-found marker
 
     def display(self):
         """Display the contents of the hash table."""
         for i in range(self.size):
-            if self.table[i] is not None:
+            if self.table[i] is not None and self.table[i] is not _DELETED:
                 # Print the index and product details
                 print(f"Index {i}: {self.table[i][0]}: {self.table[i][1]}")
+
+
+_MASK64 = (1 << 64) - 1
+
+
+def mix_hash(key) -> int:
+    """Scramble a key with the SplitMix64 finalizer so sequential IDs spread over the whole table."""
+    x = (hash(key) + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+class RobinHoodHashTable(CountingTable):
+    def __init__(self, size: int = 8, max_load_factor: float = 0.85):
+        """Initialize an open-addressing table that resizes itself and bounds probe lengths with Robin Hood hashing."""
+        self.size = 1 << max(3, (size - 1).bit_length())  # Power of two so the index is a bit mask
+        self.max_load_factor = max_load_factor
+        self.count = 0  # Number of stored products
+        self.keys = [None] * self.size
+        self.values = [None] * self.size  # Product records stored under each key
+        self.distances = [-1] * self.size  # Probe distance from the home slot, -1 for an empty slot
+        self.collisions = 0  # Track the number of collisions
+        self.probing_count = 0  # Track the number of probing attempts
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def load_factor(self) -> float:
+        """Fraction of slots currently holding a product."""
+        return self.count / self.size
+
+    def _hash(self, product_id) -> int:
+        """Hash function mapping a product ID to its home slot."""
+        return mix_hash(product_id) & (self.size - 1)
+
+    def insert(self, product_id, product):
+        """Insert or replace a product, displacing entries that sit closer to their home slot."""
+        if (self.count + 1) > self.size * self.max_load_factor:
+            self._rehash(self.size * 2)
+        self.probing_count += 1  # Increment probing attempts for insertion
+        if self._place(product_id, product):
+            self.count += 1
+
+    def _place(self, key, value) -> bool:
+        """Robin Hood insertion; returns True if a new key was added rather than replaced."""
+        mask = self.size - 1
+        index = self._hash(key)
+        distance = 0
+        while True:
+            slot_distance = self.distances[index]
+            if slot_distance < 0:
+                # Empty slot: claim it
+                self.keys[index], self.values[index], self.distances[index] = key, value, distance
+                return True
+            if slot_distance == distance and self.keys[index] == key:
+                self.values[index] = value  # Same key: replace the stored product
+                return False
+            self.collisions += 1  # Collision occurred
+            if slot_distance < distance:
+                # The resident is closer to home than we are: take its slot and carry it onward
+                key, self.keys[index] = self.keys[index], key
+                value, self.values[index] = self.values[index], value
+                distance, self.distances[index] = slot_distance, distance
+            index = (index + 1) & mask
+            distance += 1
+            self.probing_count += 1  # Count each probing step
+
+    def _find(self, product_id) -> int:
+        """Return the slot holding product_id, or -1; stops as soon as the probe passes where it could be."""
+        mask = self.size - 1
+        index = self._hash(product_id)
+        distance = 0
+        while self.distances[index] >= distance:
+            if self.distances[index] == distance and self.keys[index] == product_id:
+                return index
+            index = (index + 1) & mask
+            distance += 1
+            self.probing_count += 1  # Count each probing step
+        return -1
+
+    def search(self, product_id):
+        """Search for a product by its ID; returns the stored product or None."""
+        return self._get(product_id, None)
+
+    def _get(self, product_id, default):
+        """Return the product stored for product_id, or default."""
+        self.probing_count += 1  # Increment probing attempts for searching
+        index = self._find(product_id)
+        return self.values[index] if index >= 0 else default
+
+    def __contains__(self, product_id) -> bool:
+        return self._find(product_id) >= 0
+
+    def delete(self, product_id) -> bool:
+        """Remove a product by shifting the following cluster back one slot, so no tombstones are needed."""
+        self.probing_count += 1  # Increment probing attempts for deletion
+        index = self._find(product_id)
+        if index < 0:
+            return False
+        mask = self.size - 1
+        following = (index + 1) & mask
+        while self.distances[following] > 0:
+            # Move the next entry one slot closer to its home
+            self.keys[index] = self.keys[following]
+            self.values[index] = self.values[following]
+            self.distances[index] = self.distances[following] - 1
+            index, following = following, (following + 1) & mask
+        self.keys[index], self.values[index], self.distances[index] = None, None, -1
+        self.count -= 1
+        return True
+
+    def _rehash(self, new_size: int):
+        """Reinsert every product into a table of new_size slots."""
+        entries = [(k, v) for k, v, d in zip(self.keys, self.values, self.distances) if d >= 0]
+        self.size = new_size
+        self.keys = [None] * self.size
+        self.values = [None] * self.size
+        self.distances = [-1] * self.size
+        for key, value in entries:
+            self._place(key, value)
+
+    def items(self):
+        """Yield (product_id, product) pairs in slot order."""
+        for key, value, distance in zip(self.keys, self.values, self.distances):
+            if distance >= 0:
+                yield key, value
+
+    def probe_length_histogram(self) -> dict:
+        """Count stored products by probe distance from their home slot."""
+        histogram = {}
+        for distance in self.distances:
+            if distance >= 0:
+                histogram[distance] = histogram.get(distance, 0) + 1
+        return dict(sorted(histogram.items()))
+
+    def display(self):
+        """Display the contents of the hash table."""
+        for i in range(self.size):
+            if self.distances[i] >= 0:
+                # Print the index, probe distance and product details
+                print(f"Index {i} (+{self.distances[i]}): {self.keys[i]}: {self.values[i]}")
@@ -0,0 +1,217 @@
+import cProfile
+import io
+import logging
+import math
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Root of the loggers used by the managers and data structures. A NullHandler keeps them quiet unless
+# the application configures logging (main.py does, to show the demo messages)
+LOGGER_NAME = "catalog"
+logging.getLogger(LOGGER_NAME).addHandler(logging.NullHandler())
+
+# Environment variables selecting an optional profiling mode for profile_capture()
+PROFILE_ENV = "CATALOG_PROFILE"  # "cprofile", "tracemalloc" or "cprofile,tracemalloc"
+PROFILE_OUTPUT_ENV = "CATALOG_PROFILE_OUTPUT"  # cProfile stats file; the report goes to stderr if unset
+
+# Latency histogram buckets are powers of two of a microsecond: bucket i holds [2^(i-1), 2^i) µs
+HISTOGRAM_BUCKETS = 32
+
+
+def get_logger(name: str) -> logging.Logger:
+    # Logger for one module, under the quiet-by-default "catalog" root
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+class LatencyHistogram:
+    def __init__(self):
+        # Count, total and extremes plus log2-spaced bucket counts of observed durations
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+
+    def observe(self, seconds: float):
+        # Record one duration
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        micros = int(seconds * 1e6)
+        self.buckets[min(micros.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+
+    def percentile(self, p: float) -> float:
+        # Approximate p-th percentile in seconds: the upper edge of the bucket holding it
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min((1 << bucket) / 1e6, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        # Count and latency statistics in seconds
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class Instrumentation:
+    def __init__(self):
+        # Operation counters, per-operation latency histograms and event hooks for one component
+        self.counters: Counter = Counter()
+        self.latencies: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self._hooks: Dict[str, List[Callable[[str, Dict[str, Any]], None]]] = defaultdict(list)
+
+    def increment(self, name: str, amount: int = 1):
+        # Add to a named counter
+        self.counters[name] += amount
+
+    def observe(self, name: str, seconds: float):
+        # Record a duration for a named operation
+        self.latencies[name].observe(seconds)
+
+    @contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        # Time the enclosed block into the histogram for name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def on(self, event: str, callback: Callable[[str, Dict[str, Any]], None]):
+        # Call callback(event, payload) whenever the event is emitted; "*" subscribes to every event
+        self._hooks[event].append(callback)
+
+    def emit(self, event: str, **payload):
+        # Count an event and pass it to its subscribers, if any
+        self.increment(event)
+        if self._hooks:
+            for callback in self._hooks.get(event, ()):
+                callback(event, payload)
+            for callback in self._hooks.get("*", ()):
+                callback(event, payload)
+
+    def snapshot(self) -> Dict[str, Any]:
+        # Current counters and latency summaries, e.g. for JSON export
+        return {
+            "counters": dict(self.counters),
+            "latencies": {name: histogram.summary() for name, histogram in self.latencies.items()},
+        }
+
+    def reset(self):
+        # Clear counters and histograms, keeping the hooks
+        self.counters.clear()
+        self.latencies.clear()
+
+    def report(self) -> List[str]:
+        # Human-readable lines: one per counter, then one per timed operation
+        lines = [f"{name}: {count}" for name, count in sorted(self.counters.items())]
+        for name, histogram in sorted(self.latencies.items()):
+            stats = histogram.summary()
+            lines.append(
+                f"{name}: n={stats['count']} mean={stats['mean'] * 1e6:.1f}us "
+                f"p50={stats['p50'] * 1e6:.0f}us p99={stats['p99'] * 1e6:.0f}us max={stats['max'] * 1e6:.1f}us"
+            )
+        return lines
+
+
+class SynchronizedInstrumentation(Instrumentation):
+    def __init__(self):
+        # Instrumentation shared by several threads: counter and histogram updates and reads all hold
+        # one lock, so concurrent updates are not lost. Hooks still run on the emitting thread
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, amount: int = 1):
+        with self._lock:
+            super().increment(name, amount)
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            super().observe(name, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return super().snapshot()
+
+    def reset(self):
+        with self._lock:
+            super().reset()
+
+    def report(self) -> List[str]:
+        with self._lock:
+            return super().report()
+
+
+def instrumented(name: Optional[str] = None):
+    # Method decorator: count calls and time them into self.metrics under name (default: the method name)
+    def decorate(method):
+        operation = name or method.__name__
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                metrics.observe(operation, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def profile_capture(mode: Optional[str] = None, output: Optional[str] = None,
+                    top: int = 25) -> Iterator[None]:
+    # Profile the enclosed block with cProfile and/or tracemalloc. The mode defaults to the
+    # CATALOG_PROFILE environment variable, so production-like runs can be profiled without code
+    # changes; with no mode set this does nothing. Reports go to stderr
+    mode = (mode if mode is not None else os.environ.get(PROFILE_ENV, "")).lower()
+    output = output or os.environ.get(PROFILE_OUTPUT_ENV)
+    modes = {part.strip() for part in mode.split(",") if part.strip()}
+    profiler = cProfile.Profile() if "cprofile" in modes else None
+    tracing = "tracemalloc" in modes and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            if output:
+                profiler.dump_stats(output)
+                sys.stderr.write(f"cProfile stats written to {output}\n")
+            else:
+                stream = io.StringIO()
+                pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+                sys.stderr.write(stream.getvalue())
+        if tracing:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            lines = [f"tracemalloc: current={current / 1024:.0f} KiB peak={peak / 1024:.0f} KiB"]
+            lines += [str(stat) for stat in snapshot.statistics("lineno")[:top]]
+            sys.stderr.write("\n".join(lines) + "\n")
@@ -0,0 +1,47 @@
+from SortedIndex import SliceView
+
+def _price(product):
+    # Default search key: the product's price
+    return product.price
+
+def interpolation_bound(products, value, key=_price, right=False, low=0, high=None):
+    # First index in [low, high) whose key is > value (right) or >= value (left), in a sequence sorted
+    # by a numeric key. Each probe is guessed from the values at the ends of the range; whenever a
+    # guess fails to at least halve the range, the next probe bisects instead. Evenly spread keys
+    # take O(log log n) probes, and skewed ones still take at most about 2 log n instead of O(n)
+    if high is None:
+        high = len(products)
+    before = (lambda k: k <= value) if right else (lambda k: k < value)
+    bisect_next = False
+    while low < high:
+        width = high - low
+        if bisect_next:
+            mid = (low + high) // 2
+        else:
+            first, last = key(products[low]), key(products[high - 1])
+            if not before(first):
+                return low
+            if before(last):
+                return high
+            # first < value <= last here, so the range spans distinct values
+            mid = low + int((value - first) / (last - first) * (width - 1))
+            mid = min(max(mid, low), high - 1)
+        if before(key(products[mid])):
+            low = mid + 1
+        else:
+            high = mid
+        bisect_next = (high - low) * 2 > width
+    return low
+
+def interpolation_search(products, price, key=_price, tolerance=0.0):
+    # Perform interpolation search for a product by price in a sequence sorted by price.
+    # Returns the first product whose key is within tolerance of price (exact by default), or None
+    position = interpolation_bound(products, price - tolerance, key)
+    if position < len(products) and key(products[position]) <= price + tolerance:
+        return products[position]
+    return None
+
+def interpolation_search_range(products, low, high, key=_price):
+    # All products with low <= key <= high, as a lazy view over the sorted sequence; nothing is copied
+    start = interpolation_bound(products, low, key)
+    return SliceView(products, start, interpolation_bound(products, high, key, right=True, low=start))
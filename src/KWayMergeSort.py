@@ -1,44 +1,178 @@
-def k_way_merge_sort(products, k):
+import heapq
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
+import numpy as np
+from SortEngine import DescendingKey
+
+
+def _sales_volume(product):
+    # Default sort key: the product's sales volume
+    return product.sales_volume
+
+
+def k_way_merge_sort(products, k, key=_sales_volume):
     # Sort the products using k-way merge sort
+    # Fewer than two parts would never shrink the input, so the recursion could not end
+    if k < 2:
+        raise ValueError("k must be at least 2")
     # If the input list has less than 2 elements, it is already sorted
     if len(products) < 2:
         return products
 
-    # Calculate the size of each partition
-    part_size = len(products) // k
+    # Calculate the size of each partition (at least one element, so fewer than k products still split)
+    part_size = max(1, len(products) // k)
     parts = []
-    
+
     # Split the products into k parts
     for i in range(0, len(products), part_size):
         parts.append(products[i:i + part_size])
 
     # Recursively sort each part
-    sorted_parts = [k_way_merge_sort(part, k) for part in parts]
+    sorted_parts = [k_way_merge_sort(part, k, key) for part in parts]
 
     # Merge the sorted parts into a single sorted list
-    return merge_k_sorted_lists(sorted_parts)
+    return merge_k_sorted_lists(sorted_parts, key)
 
-def merge_k_sorted_lists(sorted_parts):
+def merge_k_sorted_lists(sorted_parts, key=_sales_volume):
     # Merge k sorted lists into one sorted list using a min-heap
-    import heapq
-    
     min_heap = []  # Initialize a min-heap to keep track of the smallest elements
     result = []    # This will hold the final merged result
 
     # Push the first element of each sorted part into the min-heap
     for i, part in enumerate(sorted_parts):
         if part:  # Check if the part is not empty
-            heapq.heappush(min_heap, (part[0].sales_volume, i, 0))  # Store (value, part index, element index)
+            heapq.heappush(min_heap, (key(part[0]), i, 0))  # Store (value, part index, element index)
 
     # While there are elements in the min-heap
     while min_heap:
         # Get the smallest element from the heap
-        sales_volume, part_index, element_index = heapq.heappop(min_heap)
+        value, part_index, element_index = heapq.heappop(min_heap)
         result.append(sorted_parts[part_index][element_index])  # Add the smallest element to the result
 
         # If there are more elements in the current part, add the next element to the heap
         if element_index + 1 < len(sorted_parts[part_index]):
             next_element = sorted_parts[part_index][element_index + 1]
-            heapq.heappush(min_heap, (next_element.sales_volume, part_index, element_index + 1))
+            heapq.heappush(min_heap, (key(next_element), part_index, element_index + 1))
 
     return result  # Return the merged sorted list
+
+def merge_k_sorted_streams(streams: List[Iterable], key: Callable[[Any], Any] = _sales_volume,
+                           reverse: bool = False) -> Iterator:
+    # Streaming form of merge_k_sorted_lists: lazily merge sorted iterables holding one item per stream
+    # in the heap. Ties are taken from the earlier stream first, so the merge is stable
+    wrap = DescendingKey if reverse else (lambda value: value)
+    iterators = [iter(stream) for stream in streams]
+    min_heap = []
+    for i, iterator in enumerate(iterators):
+        for item in iterator:
+            min_heap.append((wrap(key(item)), i, item))
+            break
+    heapq.heapify(min_heap)
+
+    while min_heap:
+        _, stream_index, item = min_heap[0]
+        yield item
+        # Replace the popped item with the next one from the same stream, if any
+        for next_item in iterators[stream_index]:
+            heapq.heapreplace(min_heap, (wrap(key(next_item)), stream_index, next_item))
+            break
+        else:
+            heapq.heappop(min_heap)
+
+def _write_run(items: Iterable, directory: str, batch_size: int = 1024) -> str:
+    # Write a sorted run to a temporary file as a sequence of pickled batches
+    handle, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(handle, "wb") as run_file:
+        iterator = iter(items)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                break
+            pickle.dump(batch, run_file, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+def _read_run(path: str) -> Iterator:
+    # Stream the items of a run file back one pickled batch at a time
+    with open(path, "rb") as run_file:
+        while True:
+            try:
+                batch = pickle.load(run_file)
+            except EOFError:
+                return
+            yield from batch
+
+def external_merge_sort(records: Iterable, key: Callable[[Any], Any] = _sales_volume, reverse: bool = False,
+                        run_size: int = 100_000, fan_in: int = 16, tmp_dir: Optional[str] = None) -> Iterator:
+    # Sort an iterable that may not fit in memory: sort runs of run_size items in memory, spill them to
+    # temporary files, then merge at most fan_in runs at a time. Memory stays around
+    # run_size items (while building runs) or fan_in batches (while merging), whatever the input size
+    if fan_in < 2:
+        raise ValueError("fan_in must be at least 2")
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as directory:
+        runs = []
+        iterator = iter(records)
+        while True:
+            chunk = list(islice(iterator, run_size))
+            if not chunk:
+                break
+            chunk.sort(key=key, reverse=reverse)  # Timsort is stable, also with reverse=True
+            runs.append(_write_run(chunk, directory))
+            del chunk
+
+        # Merge passes until the remaining runs can be merged in one go
+        while len(runs) > fan_in:
+            merged_runs = []
+            for start in range(0, len(runs), fan_in):
+                group = runs[start:start + fan_in]
+                merged = merge_k_sorted_streams([_read_run(path) for path in group], key, reverse)
+                merged_runs.append(_write_run(merged, directory))
+                for path in group:
+                    os.remove(path)
+            runs = merged_runs
+
+        yield from merge_k_sorted_streams([_read_run(path) for path in runs], key, reverse)
+
+def _sorted_partition_order(keys: np.ndarray, reverse: bool) -> np.ndarray:
+    # Worker task: stable sort order of one partition's key array (ties keep their input order)
+    if reverse:
+        return (len(keys) - 1) - np.argsort(keys[::-1], kind="stable")[::-1]
+    return np.argsort(keys, kind="stable")
+
+def parallel_k_way_merge_sort(products: Sequence, k: Optional[int] = None, key: str = "sales_volume",
+                              reverse: bool = False, max_workers: Optional[int] = None,
+                              min_parallel_size: int = 50_000) -> List:
+    # Sort products by a field using k partitions sorted in parallel worker processes.
+    # Workers receive only the partition's key column as a NumPy array (not pickled Product objects)
+    # and return its sort order; the parent process then heap-merges the k sorted partitions
+    n = len(products)
+    if n < 2:
+        return list(products)
+    k = max(1, min(k or os.cpu_count() or 1, n))
+    if hasattr(products, "decoded_column"):
+        keys = products.decoded_column(key)  # Columnar stores already hold the key as an array
+    else:
+        keys = np.asarray([getattr(p, key) for p in products])
+    bounds = np.linspace(0, n, k + 1).astype(np.int64).tolist()
+    partitions = [keys[start:stop] for start, stop in zip(bounds, bounds[1:])]
+
+    if n < min_parallel_size or k == 1:
+        # Process start-up and transfer costs outweigh the work on small inputs
+        orders = [_sorted_partition_order(part, reverse) for part in partitions]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers or k) as pool:
+            orders = list(pool.map(_sorted_partition_order, partitions, [reverse] * k))
+
+    # Each stream yields (key, global index) pairs in sorted order for the final heap merge
+    streams = [
+        zip(part[order].tolist(), (order + start).tolist())
+        for part, order, start in zip(partitions, orders, bounds)
+    ]
+    merged = merge_k_sorted_streams(streams, key=lambda pair: pair[0], reverse=reverse)
+    indexes = [index for _, index in merged]
+    if hasattr(products, "take"):
+        return products.take(indexes)  # Materialize store rows in one column-wise pass
+    return [products[index] for index in indexes]
@@ -0,0 +1,118 @@
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from math import inf
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from Product import Product
+
+# Length of the character n-grams used for fuzzy matching
+NGRAM_SIZE = 3
+
+
+def fold(name: str) -> str:
+    # Case-insensitive form of a name; casefold also handles characters lower() misses, such as "ß"
+    return name.casefold()
+
+
+def ngrams(folded: str, size: int = NGRAM_SIZE) -> Set[str]:
+    # Character n-grams of a folded name, padded so short names and word starts still produce n-grams
+    padded = " " * (size - 1) + folded + " "
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+class NameIndex:
+    def __init__(self):
+        # Folded name of every indexed product, needed to find its entries again on removal
+        self.names: Dict[int, str] = {}
+        # Folded name -> product IDs, for O(1) case-insensitive exact lookups
+        self.exact: Dict[str, List[int]] = defaultdict(list)
+        # (folded name, product_id) pairs in sorted order, for prefix searches with bisect
+        self.entries: List[Tuple[str, int]] = []
+        # n-gram -> product IDs containing it, for approximate matching
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+
+    @classmethod
+    def build(cls, products: Iterable[Product]) -> "NameIndex":
+        # Build an index over existing products with a single sort
+        return cls.from_pairs((p.product_name, p.product_id) for p in products)
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[str, int]]) -> "NameIndex":
+        # Build an index from (product_name, product_id) pairs, e.g. read straight from columns
+        index = cls()
+        for name, product_id in pairs:
+            index._insert(fold(name), product_id)
+        index.entries = sorted((folded, product_id) for product_id, folded in index.names.items())
+        return index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, name: str, product_id: int):
+        # Index a product's name
+        folded = fold(name)
+        self._insert(folded, product_id)
+        insort(self.entries, (folded, product_id))
+
+    def remove(self, product_id: int):
+        # Drop a product's name from every part of the index
+        folded = self.names.pop(product_id, None)
+        if folded is None:
+            return
+        ids = self.exact[folded]
+        ids.remove(product_id)
+        if not ids:
+            del self.exact[folded]
+        position = bisect_left(self.entries, (folded, product_id))
+        if position < len(self.entries) and self.entries[position] == (folded, product_id):
+            del self.entries[position]
+        for gram in ngrams(folded):
+            postings = self.postings[gram]
+            postings.discard(product_id)
+            if not postings:
+                del self.postings[gram]
+
+    def update(self, name: str, product_id: int):
+        # Re-index a product after its name changed
+        self.remove(product_id)
+        self.add(name, product_id)
+
+    def find(self, name: str) -> List[int]:
+        # IDs of the products whose name equals the given one, ignoring case, in O(1)
+        return list(self.exact.get(fold(name), ()))
+
+    def prefix(self, prefix: str, limit: Optional[int] = None) -> List[int]:
+        # IDs of the products whose name starts with prefix, ignoring case, in name order; O(log n + k)
+        folded = fold(prefix)
+        start = bisect_left(self.entries, (folded, -inf))
+        stop = len(self.entries) if limit is None else start + limit
+        result = []
+        for name, product_id in self.entries[start:stop]:
+            if not name.startswith(folded):
+                break
+            result.append(product_id)
+        return result
+
+    def fuzzy(self, query: str, limit: int = 10, min_similarity: float = 0.3) -> List[Tuple[int, float]]:
+        # Approximate matches as (product_id, similarity) pairs, best first. Similarity is the Jaccard
+        # overlap of the names' n-gram sets, so typos and reordered words still score well
+        query_grams = ngrams(fold(query))
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.postings.get(gram, ()))
+        scored = []
+        for product_id, common in shared.items():
+            name_grams = len(ngrams(self.names[product_id]))
+            similarity = common / (len(query_grams) + name_grams - common)
+            if similarity >= min_similarity:
+                scored.append((product_id, similarity))
+        scored.sort(key=lambda item: (-item[1], self.names[item[0]], item[0]))
+        return scored[:limit]
+
+    def _insert(self, folded: str, product_id: int):
+        # Add a product to the exact and n-gram parts of the index
+        if product_id in self.names:
+            self.remove(product_id)
+        self.names[product_id] = folded
+        self.exact[folded].append(product_id)
+        for gram in ngrams(folded):
+            self.postings[gram].add(product_id)
@@ -1,7 +1,23 @@
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, fields, make_dataclass
 from datetime import date
 
-@dataclass
+# Fields holding a small set of repeated labels; their strings are interned so records share one copy
+INTERNED_FIELDS = ("category", "customer_segment")
+
+
+def _normalize_record(record, set_field):
+    # Intern the categorical labels and parse ISO date strings into date objects
+    for name in INTERNED_FIELDS:
+        value = getattr(record, name)
+        if type(value) is str:
+            set_field(record, name, sys.intern(value))
+    restocked = record.last_restocked_date
+    if isinstance(restocked, str):
+        set_field(record, "last_restocked_date", date.fromisoformat(restocked))
+
+
+@dataclass(slots=True)
 class Product:
     product_id: int
     product_name: str
@@ -20,3 +36,21 @@ class Product:
     purchase_frequency: int
     profit_margin: float
     last_restocked_date: date
+
+    def __post_init__(self):
+        _normalize_record(self, setattr)
+
+
+def _frozen_post_init(self):
+    _normalize_record(self, object.__setattr__)
+
+
+# Immutable, hashable variant with the same fields; managers replace it instead of mutating it on update
+FrozenProduct = make_dataclass(
+    "FrozenProduct",
+    [(f.name, f.type) for f in fields(Product)],
+    namespace={"__post_init__": _frozen_post_init},
+    frozen=True,
+    slots=True,
+)
+FrozenProduct.__module__ = __name__
@@ -0,0 +1,309 @@
+from dataclasses import fields
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+from Product import Product
+
+# Field names in Product declaration order, used to materialize rows back into Product records
+PRODUCT_FIELDS = [f.name for f in fields(Product)]
+
+# Physical dtype of each column; categorical fields hold integer codes into a per-field category list
+COLUMN_DTYPES: Dict[str, np.dtype] = {
+    "product_id": np.dtype(np.int64),
+    "product_name": np.dtype(object),
+    "category": np.dtype(np.int32),
+    "price": np.dtype(np.float64),
+    "stock": np.dtype(np.int64),
+    "discount": np.dtype(np.float64),
+    "rating": np.dtype(np.float64),
+    "reviews": np.dtype(np.int64),
+    "sales_volume": np.dtype(np.int64),
+    "return_rate": np.dtype(np.float64),
+    "supplier_id": np.dtype(np.int64),
+    "shipping_time": np.dtype(np.int32),
+    "is_premium_supplier": np.dtype(np.bool_),
+    "customer_segment": np.dtype(np.int32),
+    "purchase_frequency": np.dtype(np.int32),
+    "profit_margin": np.dtype(np.float64),
+    "last_restocked_date": np.dtype("datetime64[D]"),
+}
+
+CATEGORICAL_FIELDS = ("category", "customer_segment")
+
+
+class ColumnarProductStore:
+    def __init__(self, initial_capacity: int = 1024):
+        # Store one typed NumPy array per Product field instead of one Python object per product
+        self.capacity = max(1, initial_capacity)
+        self.size = 0
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.empty(self.capacity, dtype=dtype) for name, dtype in COLUMN_DTYPES.items()
+        }
+        # Categorical fields keep their distinct values once and store small integer codes per row
+        self.categories: Dict[str, List[str]] = {name: [] for name in CATEGORICAL_FIELDS}
+        self._category_codes: Dict[str, Dict[str, int]] = {name: {} for name in CATEGORICAL_FIELDS}
+
+    @classmethod
+    def from_products(cls, products: Iterable[Product]) -> "ColumnarProductStore":
+        # Build a store from any iterable of Product records
+        products = list(products)
+        store = cls(initial_capacity=len(products))
+        store.extend(products)
+        return store
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Sequence]) -> "ColumnarProductStore":
+        # Build a store from one sequence or array per Product field
+        store = cls(initial_capacity=len(columns["product_id"]))
+        store.extend_columns(columns)
+        return store
+
+    def copy(self) -> "ColumnarProductStore":
+        # Independent in-memory copy of the live rows, e.g. to edit without disturbing readers of this one
+        store = ColumnarProductStore(initial_capacity=self.size)
+        for name in PRODUCT_FIELDS:
+            store.columns[name][:self.size] = self.column(name)
+        store.size = self.size
+        store.categories = {name: list(labels) for name, labels in self.categories.items()}
+        store._category_codes = {name: dict(codes) for name, codes in self._category_codes.items()}
+        return store
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Product]:
+        # Materialize products in chunks so iteration does not touch every column per row
+        chunk = 4096
+        for start in range(0, self.size, chunk):
+            yield from self[start:min(start + chunk, self.size)]
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Product, List[Product]]:
+        # Materialize a single row or a slice of rows as Product records
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.size)
+            return self._materialize(np.arange(start, stop, step))
+        return self._materialize(np.array([self._check_row(index)]))[0]
+
+    def __setitem__(self, index: int, product: Product):
+        # Overwrite every column of a row with the values of the given product
+        row = self._check_row(index)
+        for name in PRODUCT_FIELDS:
+            self.columns[name][row] = self._encode(name, getattr(product, name))
+
+    def append(self, product: Product):
+        # Append one product, growing all columns geometrically when full
+        self._ensure_capacity(self.size + 1)
+        self.size += 1
+        self[self.size - 1] = product
+
+    def extend(self, products: Iterable[Product]):
+        # Append many products with one column-wise write per field
+        products = list(products)
+        if not products:
+            return
+        self.extend_columns({name: [getattr(p, name) for p in products] for name in PRODUCT_FIELDS})
+
+    def extend_columns(self, columns: Dict[str, Sequence]):
+        # Append a batch given as one sequence or array per field, e.g. a parsed CSV chunk
+        count = len(columns["product_id"])
+        if count == 0:
+            return
+        start, stop = self.size, self.size + count
+        self._ensure_capacity(stop)
+        for name in PRODUCT_FIELDS:
+            values = columns[name]
+            if name in CATEGORICAL_FIELDS:
+                values = self._codes(name, values)
+            elif name == "last_restocked_date":
+                values = self._dates(values)
+            self.columns[name][start:stop] = values
+        self.size = stop
+
+    def update_row(self, row: int, **updates):
+        # Update selected fields of a single row in place
+        row = self._check_row(row)
+        for name, value in updates.items():
+            self.columns[name][row] = self._encode(name, value)
+
+    def delete_rows(self, rows: Union[np.ndarray, Sequence[int]]):
+        # Remove the given rows, keeping the remaining rows in their current order
+        keep = np.ones(self.size, dtype=bool)
+        keep[np.asarray(rows, dtype=np.int64)] = False
+        new_size = int(keep.sum())
+        for name, column in self.columns.items():
+            column[:new_size] = column[:self.size][keep]
+            if column.dtype == object:
+                column[new_size:self.size] = None
+        self.size = new_size
+
+    def swap_remove(self, row: int) -> Optional[int]:
+        # Remove a row in O(1) by moving the last row into its place; returns the moved row's old index
+        row = self._check_row(row)
+        last = self.size - 1
+        for column in self.columns.values():
+            column[row] = column[last]
+            if column.dtype == object:
+                column[last] = None
+        self.size = last
+        return last if row != last else None
+
+    def column(self, name: str) -> np.ndarray:
+        # Return a view of the live part of a column (categorical fields are returned as codes)
+        return self.columns[name][:self.size]
+
+    def decoded_column(self, name: str) -> np.ndarray:
+        # Return a column with categorical codes replaced by their string values
+        if name in CATEGORICAL_FIELDS:
+            return np.asarray(self.categories[name], dtype=object)[self.column(name)]
+        return self.column(name)
+
+    def rows_where(self, **conditions) -> np.ndarray:
+        # Vectorized filter returning matching row indexes.
+        # A value matches by equality; a (low, high) tuple matches an inclusive range with None as an open end
+        mask = np.ones(self.size, dtype=bool)
+        for name, condition in conditions.items():
+            column = self.column(name)
+            if isinstance(condition, tuple):
+                low, high = condition
+                if low is not None:
+                    mask &= column >= self._encode(name, low)
+                if high is not None:
+                    mask &= column <= self._encode(name, high)
+            elif name in CATEGORICAL_FIELDS:
+                code = self._category_codes[name].get(condition)
+                if code is None:
+                    return np.empty(0, dtype=np.int64)
+                mask &= column == code
+            else:
+                mask &= column == self._encode(name, condition)
+        return np.flatnonzero(mask)
+
+    def take(self, rows: Union[np.ndarray, Sequence[int]]) -> List[Product]:
+        # Materialize the given rows, in the given order, as Product records
+        return self._materialize(np.asarray(rows, dtype=np.int64))
+
+    def filter(self, **conditions) -> List[Product]:
+        # Return the products matching all conditions (see rows_where)
+        return self.take(self.rows_where(**conditions))
+
+    def argsort(self, name: str, descending: bool = False) -> np.ndarray:
+        # Stable row order sorting the given field; categorical fields sort by their string value
+        column = self.column(name)
+        if name in CATEGORICAL_FIELDS:
+            ranks = np.argsort(np.asarray(self.categories[name], dtype=object), kind="stable")
+            lookup = np.empty(len(ranks), dtype=np.int64)
+            lookup[ranks] = np.arange(len(ranks))
+            column = lookup[column]
+        elif column.dtype == object:
+            column = np.asarray(column, dtype=str)
+        if descending:
+            # Reverse the stable ascending order within equal keys so ties keep insertion order
+            order = np.argsort(column[::-1], kind="stable")[::-1]
+            return (self.size - 1) - order
+        return np.argsort(column, kind="stable")
+
+    def sort_by(self, name: str, descending: bool = False):
+        # Reorder all rows in place by the given field using a vectorized argsort
+        self.permute(self.argsort(name, descending))
+
+    def sort(self, key=None, reverse: bool = False):
+        # list.sort-compatible sort so the store can stand in for a List[Product]
+        if key is None:
+            self.sort_by("product_id", descending=reverse)
+            return
+        keys = [key(product) for product in self]
+        order = sorted(range(self.size), key=keys.__getitem__, reverse=reverse)
+        self.permute(np.asarray(order, dtype=np.int64))
+
+    def permute(self, order: np.ndarray):
+        # Rearrange rows so that new row i is old row order[i]
+        for name, column in self.columns.items():
+            column[:self.size] = column[:self.size][order]
+
+    def total_revenue(self) -> float:
+        # Sum of sales_volume * price over all rows at array speed
+        return float(np.dot(self.column("sales_volume").astype(np.float64), self.column("price")))
+
+    def to_products(self) -> List[Product]:
+        # Materialize every row as a Product record
+        return self[:]
+
+    @property
+    def nbytes(self) -> int:
+        # Approximate memory held by the live rows, counting object columns by their string payloads
+        total = 0
+        for name, column in self.columns.items():
+            if column.dtype == object:
+                total += column.itemsize * self.size
+                total += sum(len(value) for value in column[:self.size] if value is not None)
+            else:
+                total += column.itemsize * self.size
+        return total
+
+    def _materialize(self, rows: np.ndarray) -> List[Product]:
+        # Convert the given rows back to Product records column by column
+        values = [self._values(name, rows) for name in PRODUCT_FIELDS]
+        return [Product(*row) for row in zip(*values)]
+
+    def _values(self, name: str, rows: np.ndarray) -> list:
+        # Python values of one field for the given rows
+        column = self.columns[name][rows]
+        if name in CATEGORICAL_FIELDS:
+            labels = self.categories[name]
+            return [labels[code] for code in column.tolist()]
+        if name == "last_restocked_date":
+            return column.astype(object).tolist()
+        return column.tolist()
+
+    def _ensure_capacity(self, needed: int):
+        # Grow all columns geometrically so repeated appends stay amortized O(1)
+        if needed <= self.capacity:
+            return
+        new_capacity = max(needed, self.capacity * 2)
+        for name, column in self.columns.items():
+            grown = np.empty(new_capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+        self.capacity = new_capacity
+
+    def _check_row(self, index: int) -> int:
+        # Normalize negative indexes and reject rows outside the live range
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("product store index out of range")
+        return index
+
+    def _code(self, name: str, value: str) -> int:
+        # Return the categorical code for a value, registering it on first use
+        codes = self._category_codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = len(self.categories[name])
+            codes[value] = code
+            self.categories[name].append(value)
+        return code
+
+    def _codes(self, name: str, values: Sequence[str]) -> np.ndarray:
+        # Encode a batch of categorical values, looking up each distinct value only once
+        inverse, uniques = pd.factorize(np.asarray(values, dtype=object), use_na_sentinel=False)
+        return np.asarray([self._code(name, value) for value in uniques.tolist()], dtype=np.int32)[inverse]
+
+    def _dates(self, values: Sequence) -> np.ndarray:
+        # Encode a batch of dates given as datetime64 values, date objects, ISO strings or None
+        if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+            return values.astype("datetime64[D]")
+        return np.asarray([self._encode("last_restocked_date", value) for value in values], dtype="datetime64[D]")
+
+    def _encode(self, name: str, value):
+        # Convert a Python field value to its column representation
+        if name in CATEGORICAL_FIELDS:
+            return self._code(name, value)
+        if name == "last_restocked_date":
+            if value is None:
+                return np.datetime64("NaT", "D")
+            if isinstance(value, date):
+                return np.datetime64(value.isoformat(), "D")
+            return np.datetime64(value, "D")
+        return value
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from QueryServer import DEFAULT_HOST, DEFAULT_PORT, MAX_LINE
+
+# Default share of each query type in the generated load
+DEFAULT_MIX = {"get": 0.85, "get_many": 0.05, "range": 0.05, "top_k": 0.02, "revenue": 0.02, "mst": 0.01}
+RANGE_FIELDS = ("price", "rating", "sales_volume")
+TOP_K_FIELDS = ("sales_volume", "rating", "price", "profit_margin")
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    # Parse "get=0.9,range=0.1" into a query mix
+    mix = {}
+    for part in text.split(","):
+        op, _, weight = part.partition("=")
+        mix[op.strip()] = float(weight)
+    return mix
+
+
+def make_request(op: str, rng: random.Random, max_id: int) -> Dict[str, Any]:
+    # A random request of the given type; IDs are drawn from 1..max_id, so a few may miss
+    if op == "get":
+        return {"op": "get", "product_id": rng.randint(1, max_id)}
+    if op == "get_many":
+        return {"op": "get_many", "product_ids": [rng.randint(1, max_id) for _ in range(50)]}
+    if op == "range":
+        field = rng.choice(RANGE_FIELDS)
+        low = {"price": rng.uniform(1, 200), "rating": rng.choice([3.0, 3.5, 4.0, 4.5]),
+               "sales_volume": rng.randint(10, 200)}[field]
+        return {"op": "range", "field": field, "low": low, "high": low * 1.05, "limit": 20}
+    if op == "top_k":
+        return {"op": "top_k", "field": rng.choice(TOP_K_FIELDS), "k": 10}
+    if op == "revenue":
+        return {"op": "revenue", "by": rng.choice([None, "category", "customer_segment"])}
+    if op == "mst":
+        return {"op": "mst", "algorithm": rng.choice(["kruskal", "prim"])}
+    return {"op": op}
+
+
+async def _connection(host: str, port: int, plan: List[Tuple[str, Dict[str, Any]]], pipeline: int,
+                      latencies: Dict[str, List[float]], errors: Dict[str, int]):
+    # Send the planned requests over one connection, keeping up to pipeline of them in flight
+    reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+    # Request id -> (op, send time) for the requests awaiting a response
+    in_flight: Dict[int, Tuple[str, float]] = {}
+    slots = asyncio.Semaphore(pipeline)
+
+    async def receive():
+        for _ in range(len(plan)):
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("Server closed the connection early")
+            response = json.loads(line)
+            op, started = in_flight.pop(response["id"])
+            latencies[op].append(time.perf_counter() - started)
+            if not response["ok"]:
+                errors[op] += 1
+            slots.release()
+
+    receiver = asyncio.create_task(receive())
+    for request_id, (op, request) in enumerate(plan):
+        await slots.acquire()
+        in_flight[request_id] = (op, time.perf_counter())
+        writer.write(json.dumps({"id": request_id, **request}).encode("utf-8") + b"\n")
+        await writer.drain()
+    await receiver
+    writer.close()
+    await writer.wait_closed()
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    # Request count and latency percentiles in milliseconds
+    if not samples:
+        return {"count": 0}
+    values = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]).tolist()
+    return {"count": len(samples), "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": float(values.max())}
+
+
+async def run_load(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, requests: int = 20_000,
+                   connections: int = 8, pipeline: int = 32, mix: Optional[Dict[str, float]] = None,
+                   max_id: Optional[int] = None, seed: int = 0) -> Dict[str, Any]:
+    # Drive a query server with a random request mix and report throughput and latency percentiles
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    if max_id is None:
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+        writer.write(b'{"id": 0, "op": "stats"}\n')
+        max_id = json.loads(await reader.readline())["result"]["products"]
+        writer.close()
+        await writer.wait_closed()
+    ops = rng.choices(list(mix), weights=list(mix.values()), k=requests)
+    plans = [[] for _ in range(connections)]
+    for i, op in enumerate(ops):
+        plans[i % connections].append((op, make_request(op, rng, max(1, max_id))))
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    start = time.perf_counter()
+    await asyncio.gather(*(_connection(host, port, plan, pipeline, latencies, errors) for plan in plans))
+    elapsed = time.perf_counter() - start
+    overall = [sample for samples in latencies.values() for sample in samples]
+    return {
+        "requests": len(overall),
+        "errors": sum(errors.values()),
+        "seconds": elapsed,
+        "requests_per_second": len(overall) / elapsed if elapsed else 0.0,
+        "latency": _summary(overall),
+        "by_op": {op: {**_summary(samples), "errors": errors[op]} for op, samples in sorted(latencies.items())},
+    }
+
+
+def format_report(report: Dict[str, Any]) -> List[str]:
+    # Render a load report as text lines
+    lines = [f"{report['requests']} requests in {report['seconds']:.2f}s: "
+             f"{report['requests_per_second']:,.0f} req/s, {report['errors']} errors"]
+    rows = [("all", report["latency"])] + list(report["by_op"].items())
+    lines.append(f"{'op':<10}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for op, stats in rows:
+        if stats["count"]:
+            lines.append(f"{op:<10}{stats['count']:>8}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+                         f"{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}")
+    return lines
+
+
+async def _main(args) -> Dict[str, Any]:
+    # Run the load, optionally against a server started in this process for a quick local benchmark
+    server = None
+    host, port, max_id = args.host, args.port, args.max_id
+    if args.serve:
+        from CatalogGenerator import CatalogGenerator
+        from ConcurrentProductManager import ConcurrentProductManager
+        from QueryServer import QueryServer
+
+        generator = CatalogGenerator(args.seed, n_suppliers=max(10, args.serve // 200))
+        server = QueryServer(ConcurrentProductManager(generator.store(args.serve)))
+        host, port = await server.start(host, 0)
+        max_id = max_id or generator.next_id - 1
+    try:
+        mix = parse_mix(args.mix) if args.mix else None
+        return await run_load(host, port, args.requests, args.connections, args.pipeline, mix, max_id, args.seed)
+    finally:
+        if server is not None:
+            await server.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark a query server with a random request mix.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--pipeline", type=int, default=32, help="Requests in flight per connection")
+    parser.add_argument("--mix", help='Query mix such as "get=0.9,range=0.1"')
+    parser.add_argument("--max-id", type=int, help="Largest product ID to query (default: catalog size)")
+    parser.add_argument("--serve", type=int, metavar="N",
+                        help="Start an in-process server over N generated products instead of connecting")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the report as JSON")
+    args = parser.parse_args()
+    report = asyncio.run(_main(args))
+    for line in format_report(report):
+        print(line)
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
@@ -0,0 +1,375 @@
+import asyncio
+import json
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from Product import Product
+from ProductStore import CATEGORICAL_FIELDS, PRODUCT_FIELDS
+from BasicProductManager import BasicProductManager
+from ConcurrentProductManager import CatalogSnapshot, ConcurrentProductManager
+from SupplierGraph import SupplierGraph
+from RevenueAggregator import GROUP_FIELDS
+from Instrumentation import Instrumentation, get_logger
+
+logger = get_logger("QueryServer")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Lookups arriving in the same event-loop pass are resolved together, up to this many per batch
+MAX_BATCH = 1024
+# Extra time a lookup may wait for others to join its batch; 0 batches only what is already queued
+MAX_DELAY = 0.0
+# Largest result a range or top-k query may return
+MAX_RESULTS = 1_000
+# Longest accepted request line, in bytes
+MAX_LINE = 1 << 20
+# Product IDs are stored as int64, so IDs outside this range cannot be in the catalog
+ID_LIMITS = np.iinfo(np.int64)
+
+
+def _json_default(value):
+    # Encode the non-JSON values that appear in products: dates and NumPy scalars
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _product_id(value) -> int:
+    # A product ID from a request. Only JSON integers are accepted, so 5.9, "7" or true are rejected
+    # instead of silently looking up some other product
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise TypeError(f"product_id must be an integer, not {value!r}")
+    return value
+
+
+def _product(product: Optional[Product]) -> Optional[Dict[str, Any]]:
+    # Shallow field dict of a product; dataclasses.asdict deep-copies every value, which dominates lookups
+    return {name: getattr(product, name) for name in PRODUCT_FIELDS} if product is not None else None
+
+
+class MicroBatcher:
+    def __init__(self, resolve: Callable[[List[Any]], Sequence[Any]], max_batch: int = MAX_BATCH,
+                 max_delay: float = MAX_DELAY):
+        # Coalesce single-key requests from concurrent tasks into one call of resolve(keys), which must
+        # return one result per key. A batch is flushed when it is full or, at the latest, max_delay
+        # after its first key arrived (with max_delay=0, at the end of the current event-loop pass)
+        self.resolve = resolve
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.keys = 0
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Handle] = None
+
+    async def submit(self, key) -> Any:
+        # Queue one key and wait for its result
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((key, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = (loop.call_soon(self._flush) if self.max_delay <= 0
+                           else loop.call_later(self.max_delay, self._flush))
+        return await future
+
+    def _flush(self):
+        # Resolve every queued key with a single resolve call and hand each task its result. If the
+        # batch call fails, each key is retried on its own so one bad key only fails its own request
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        self.batches += 1
+        self.keys += len(pending)
+        try:
+            results = self.resolve([key for key, _ in pending])
+        except Exception:
+            self._resolve_each(pending)
+            return
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _resolve_each(self, pending: List[Tuple[Any, asyncio.Future]]):
+        # Fallback for a failed batch: resolve the keys one at a time
+        for key, future in pending:
+            if future.done():
+                continue
+            try:
+                future.set_result(self.resolve([key])[0])
+            except Exception as error:
+                future.set_exception(error)
+
+
+class QueryServer:
+    def __init__(self, catalog: ConcurrentProductManager, executor: Optional[Executor] = None,
+                 max_batch: int = MAX_BATCH, max_delay: float = MAX_DELAY):
+        # JSON-lines query server over a concurrent catalog. Each request is one line such as
+        # {"id": 7, "op": "get", "product_id": 101} and gets one response line {"id": 7, "ok": true,
+        # "result": ...}. Requests on a connection run concurrently, so responses may arrive out of
+        # order and are matched by id. Lookups are micro-batched; sorts and MSTs run on the executor
+        self.catalog = catalog
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=4, thread_name_prefix="query")
+        self.metrics = Instrumentation()
+        self.lookups = MicroBatcher(catalog.get_products, max_batch, max_delay)
+        self._server: Optional[asyncio.AbstractServer] = None
+        # MST results for the current catalog version, keyed by algorithm; rebuilt after writes
+        self._mst_cache: Dict[str, Tuple[int, asyncio.Future]] = {}
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {
+            "get": self._get,
+            "get_many": self._get_many,
+            "search": self._search,
+            "range": self._range,
+            "top_k": self._top_k,
+            "revenue": self._revenue,
+            "mst": self._mst,
+            "stats": self._stats,
+        }
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> Tuple[str, int]:
+        # Start listening; port 0 picks a free port. Returns the bound (host, port)
+        self._server = await asyncio.start_server(self._serve_connection, host, port, limit=MAX_LINE)
+        address = self._server.sockets[0].getsockname()
+        logger.info("Query server listening on %s:%s", address[0], address[1])
+        return address[0], address[1]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        # Stop accepting connections and wait for the listener to shut down
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+
+    async def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # Answer one decoded request; errors are reported in the response rather than raised
+        request_id = request.get("id")
+        op = request.get("op")
+        handler = self._handlers.get(op)
+        if handler is None:
+            self.metrics.increment("errors")
+            error = f"Unknown op {op!r}; choose one of {sorted(self._handlers)}"
+            return {"id": request_id, "ok": False, "error": error}
+        try:
+            with self.metrics.timed(op):
+                result = await handler(request)
+        except (KeyError, TypeError, ValueError, OverflowError) as error:
+            self.metrics.increment("errors")
+            return {"id": request_id, "ok": False, "error": f"{type(error).__name__}: {error}"}
+        except Exception as error:
+            self.metrics.increment("errors")
+            logger.exception("Query %s failed", op)
+            return {"id": request_id, "ok": False, "error": f"Internal error: {type(error).__name__}"}
+        return {"id": request_id, "ok": True, "result": result}
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Read request lines and answer each in its own task, so one slow query does not hold up the rest
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    self._write(writer, {"id": None, "ok": False, "error": "Request line too long"})
+                    break
+                if not line:
+                    break
+                task = asyncio.create_task(self._answer(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _answer(self, line: bytes, writer: asyncio.StreamWriter):
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+        except ValueError as error:
+            self.metrics.increment("errors")
+            response = {"id": None, "ok": False, "error": f"Bad request: {error}"}
+        else:
+            response = await self.handle(request)
+        self._write(writer, response)
+        await writer.drain()
+
+    def _write(self, writer: asyncio.StreamWriter, response: Dict[str, Any]):
+        writer.write(json.dumps(response, default=_json_default).encode("utf-8") + b"\n")
+
+    async def _run(self, function: Callable, *args) -> Any:
+        # Run CPU-heavy work on the executor so the event loop keeps serving lookups
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    # --- Query handlers ---
+
+    async def _get(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # {"op": "get", "product_id": 101}: one product or null, micro-batched with concurrent lookups
+        product_id = _product_id(request["product_id"])
+        if not ID_LIMITS.min <= product_id <= ID_LIMITS.max:
+            return None  # Cannot be in the catalog; keep it out of the shared batch
+        return _product(await self.lookups.submit(product_id))
+
+    async def _get_many(self, request: Dict[str, Any]) -> List[Optional[Dict[str, Any]]]:
+        # {"op": "get_many", "product_ids": [...]}: aligned results, null where not found
+        return [_product(p) for p in self.catalog.get_products([_product_id(i) for i in request["product_ids"]])]
+
+    async def _search(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # {"op": "search", "name": "...", "mode": "exact" | "prefix" | "fuzzy", "limit": 10}
+        name, mode = request["name"], request.get("mode", "exact")
+        limit = min(int(request.get("limit", 10)), MAX_RESULTS)
+        if mode == "exact":
+            found = self.catalog.linear_search(name)
+            return [_product(found)] if found else []
+        if mode == "prefix":
+            return [_product(p) for p in self.catalog.prefix_search(name, limit)]
+        if mode == "fuzzy":
+            return [_product(p) for p in self.catalog.fuzzy_search(name, limit)]
+        raise ValueError(f"Unknown search mode {mode!r}")
+
+    async def _range(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # {"op": "range", "field": "price", "low": 10, "high": 20, "limit": 100}: matches in field order
+        field = request["field"]
+        limit = min(int(request.get("limit", 100)), MAX_RESULTS)
+        low, high = request.get("low"), request.get("high")
+        # Count and fetch the matches against one consistent version
+        snapshot = self.catalog.snapshot()
+        count = len(snapshot.range_view(field, low, high))
+        return {"count": count, "products": [_product(p) for p in snapshot.range_query(field, low, high, limit)]}
+
+    async def _top_k(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # {"op": "top_k", "field": "sales_volume", "k": 10, "descending": true}
+        field = request["field"]
+        k = min(int(request.get("k", 10)), MAX_RESULTS)
+        descending = bool(request.get("descending", True))
+        products = await self._run(top_k, self.catalog.snapshot(), field, k, descending)
+        return [_product(p) for p in products]
+
+    async def _revenue(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # {"op": "revenue"} for the total, or {"op": "revenue", "by": "category"} for a breakdown
+        by = request.get("by")
+        if by is None:
+            return {"total": self.catalog.calculate_total_revenue()}
+        if by not in GROUP_FIELDS:
+            raise ValueError(f"Cannot group revenue by {by}; choose one of {GROUP_FIELDS}")
+        return {"by": by, "revenue": {str(key): value for key, value in self.catalog.revenue_by(by).items()}}
+
+    async def _mst(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # {"op": "mst", "algorithm": "kruskal" | "prim"}: supplier spanning tree (forest) edges with weights.
+        # Computed once per catalog version on the executor; concurrent requests share the computation
+        algorithm = request.get("algorithm", "kruskal")
+        if algorithm not in ("kruskal", "prim"):
+            raise ValueError(f"Unknown MST algorithm {algorithm!r}")
+        snapshot = self.catalog.snapshot()
+        version = snapshot.version
+        cached = self._mst_cache.get(algorithm)
+        if cached is None or cached[0] != version:
+            future = asyncio.ensure_future(self._run(supplier_mst, snapshot, algorithm))
+            self._mst_cache[algorithm] = cached = (version, future)
+        try:
+            edges = await asyncio.shield(cached[1])
+        except Exception:
+            # Do not keep serving a failed computation; the next request retries it
+            if self._mst_cache.get(algorithm) is cached:
+                del self._mst_cache[algorithm]
+            raise
+        return {"version": version, "edges": [list(edge) for edge in edges],
+                "total_weight": sum(weight for _, _, weight in edges)}
+
+    async def _stats(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # {"op": "stats"}: catalog size and version, batching efficiency and per-op latencies
+        return {
+            "products": len(self.catalog),
+            "version": self.catalog.version,
+            "lookup_batches": self.lookups.batches,
+            "lookups_per_batch": self.lookups.keys / self.lookups.batches if self.lookups.batches else 0.0,
+            **self.metrics.snapshot(),
+        }
+
+
+def top_k(manager: Union[BasicProductManager, CatalogSnapshot], field: str, k: int,
+          descending: bool = True) -> List[Product]:
+    # The k products with the largest (or smallest) values of a numeric field, best first. Columnar
+    # catalogs select them with argpartition in O(n) and sort only those k
+    if field in CATEGORICAL_FIELDS or field == "product_name":
+        raise ValueError(f"top_k needs a numeric field, not {field}")
+    products = manager.products
+    if not manager.is_columnar or k >= len(products):
+        return manager.sorted_products(field, descending)[:k]
+    values = products.column(field)
+    if values.dtype.kind == "M":
+        values = values.view(np.int64)
+    keys = -values.astype(np.float64) if descending else values.astype(np.float64)
+    candidates = np.argpartition(keys, k - 1)[:k] if k > 0 else np.empty(0, dtype=np.int64)
+    order = candidates[np.argsort(keys[candidates], kind="stable")]
+    return products.take(order)
+
+
+def supplier_mst(manager: Union[BasicProductManager, CatalogSnapshot],
+                 algorithm: str = "kruskal") -> List[Tuple[int, int, int]]:
+    # Supplier spanning tree of a catalog as (supplier, supplier, weight) edges. Columnar catalogs feed
+    # the graph their distinct (supplier_id, category) pairs instead of every product
+    graph = SupplierGraph()
+    products = manager.products
+    if manager.is_columnar:
+        pairs = np.unique(np.stack([products.column("supplier_id"),
+                                    products.column("category").astype(np.int64)], axis=1), axis=0)
+        labels = products.categories["category"]
+        for supplier_id, code in pairs.tolist():
+            graph.add_product(supplier_id, labels[code])
+    else:
+        graph.add_products(products)
+    graph.create_graph()
+    return graph.kruskal_mst(with_weights=True) if algorithm == "kruskal" else graph.prim_mst(with_weights=True)
+
+
+async def serve(catalog: ConcurrentProductManager, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                max_batch: int = MAX_BATCH, max_delay: float = MAX_DELAY):
+    # Run a query server until cancelled
+    server = QueryServer(catalog, max_batch=max_batch, max_delay=max_delay)
+    await server.start(host, port)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import logging
+    import sys
+    from CatalogGenerator import CatalogGenerator
+    from Snapshot import open_snapshot
+
+    parser = argparse.ArgumentParser(description="Serve product catalog queries as JSON lines over TCP.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--snapshot", help="Serve a saved snapshot instead of a generated catalog")
+    parser.add_argument("--products", type=int, default=100_000, help="Size of the generated catalog")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-delay", type=float, default=MAX_DELAY)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    if args.snapshot:
+        store = open_snapshot(args.snapshot)
+    else:
+        store = CatalogGenerator(args.seed, n_suppliers=max(10, args.products // 200)).store(args.products)
+    try:
+        asyncio.run(serve(ConcurrentProductManager(store), args.host, args.port, args.max_batch, args.max_delay))
+    except KeyboardInterrupt:
+        pass
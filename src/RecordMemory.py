@@ -0,0 +1,72 @@
+import gc
+import random
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from typing import Callable, Dict, List, Sequence
+from Product import Product, FrozenProduct
+from ProductStore import ColumnarProductStore
+
+# The original record layout: a regular dataclass with a per-instance __dict__ and nothing interned
+DictProduct = make_dataclass("DictProduct", [(f.name, f.type) for f in fields(Product)])
+
+CATEGORIES = ("Electronics", "Apparel", "Home Appliances", "Books", "Toys")
+SEGMENTS = ("Premium", "Retail", "Wholesale")
+
+
+def _raw_rows(n: int, seed: int = 0) -> List[tuple]:
+    # Generate rows the way a parser produces them: every label and date is a fresh string object
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        rows.append((
+            i, f"Product {i}", "".join(rng.choice(CATEGORIES)), round(rng.uniform(5, 500), 2),
+            rng.randint(0, 500), rng.randint(0, 30), round(rng.uniform(1, 5), 1), rng.randint(0, 1000),
+            rng.randint(0, 500), round(rng.uniform(0, 5), 1), rng.randint(200, 300), rng.randint(1, 10),
+            rng.random() < 0.3, "".join(rng.choice(SEGMENTS)), rng.randint(1, 10), rng.randint(5, 40),
+            f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        ))
+    return rows
+
+
+def measure_retained(n: int, build: Callable[[List[tuple]], object], seed: int = 0) -> Dict[str, float]:
+    # Build n records from raw rows and report the memory they keep alive once the rows are dropped
+    gc.collect()
+    tracemalloc.start()
+    try:
+        rows = _raw_rows(n, seed)
+        records = build(rows)
+        del rows
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del records
+    return {"bytes_per_record": current / n, "peak_bytes_per_record": peak / n}
+
+
+def compare_record_memory(n: int = 20_000) -> Dict[str, Dict[str, float]]:
+    # Measure memory per record for each record layout, including the field values they hold
+    builders: Dict[str, Callable[[List[tuple]], object]] = {
+        "dataclass (__dict__)": lambda rows: [DictProduct(*row) for row in rows],
+        "Product (slots, interned)": lambda rows: [Product(*row) for row in rows],
+        "FrozenProduct": lambda rows: [FrozenProduct(*row) for row in rows],
+        "ColumnarProductStore": lambda rows: ColumnarProductStore.from_products(Product(*row) for row in rows),
+    }
+    return {name: measure_retained(n, build) for name, build in builders.items()}
+
+
+def format_report(results: Dict[str, Dict[str, float]], baseline: str = "dataclass (__dict__)") -> Sequence[str]:
+    # Render the comparison as text lines, relative to the baseline layout
+    base = results[baseline]["bytes_per_record"]
+    lines = [f"{'Layout':<28}{'bytes/record':>14}{'peak/record':>14}{'vs baseline':>13}"]
+    for name, result in results.items():
+        lines.append(
+            f"{name:<28}{result['bytes_per_record']:>14.1f}{result['peak_bytes_per_record']:>14.1f}"
+            f"{result['bytes_per_record'] / base:>12.0%}"
+        )
+    return lines
+
+
+if __name__ == "__main__":
+    for line in format_report(compare_record_memory()):
+        print(line)
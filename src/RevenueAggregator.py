@@ -0,0 +1,95 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Tuple
+import numpy as np
+from Product import Product
+from ProductStore import ColumnarProductStore, CATEGORICAL_FIELDS
+
+# Fields revenue is broken down by
+GROUP_FIELDS = ("category", "supplier_id", "customer_segment")
+
+
+class RevenueAggregator:
+    def __init__(self, group_fields: Tuple[str, ...] = GROUP_FIELDS):
+        # Running revenue totals, overall and per group, kept current as products change
+        self.group_fields = group_fields
+        self.count = 0
+        self._total = 0.0
+        self._compensation = 0.0  # Neumaier compensation term so add/remove cycles do not drift
+        self.by_field: Dict[str, Dict[Any, float]] = {field: defaultdict(float) for field in group_fields}
+        self._group_counts: Dict[str, Dict[Any, int]] = {field: defaultdict(int) for field in group_fields}
+
+    @classmethod
+    def from_products(cls, products: Iterable[Product], group_fields: Tuple[str, ...] = GROUP_FIELDS) -> "RevenueAggregator":
+        # Build all totals in a single pass over the products
+        aggregator = cls(group_fields)
+        for product in products:
+            if product is not None:
+                aggregator.add(product)
+        return aggregator
+
+    @classmethod
+    def from_store(cls, store: ColumnarProductStore, group_fields: Tuple[str, ...] = GROUP_FIELDS) -> "RevenueAggregator":
+        # Build all totals from a columnar store with vectorized group sums
+        aggregator = cls(group_fields)
+        revenue = store.column("sales_volume").astype(np.float64) * store.column("price")
+        aggregator.count = len(store)
+        aggregator._total = float(np.sum(revenue))
+        for field in group_fields:
+            if field in CATEGORICAL_FIELDS:
+                keys = store.categories[field]
+                codes = store.column(field)
+            else:
+                unique_keys, codes = np.unique(store.column(field), return_inverse=True)
+                keys = unique_keys.tolist()
+            sums = np.bincount(codes, weights=revenue, minlength=len(keys))
+            counts = np.bincount(codes, minlength=len(keys))
+            for key, group_sum, group_count in zip(keys, sums.tolist(), counts.tolist()):
+                if group_count:
+                    aggregator.by_field[field][key] = group_sum
+                    aggregator._group_counts[field][key] = group_count
+        return aggregator
+
+    @property
+    def total(self) -> float:
+        # Total revenue of all products, read in O(1)
+        return self._total + self._compensation
+
+    def add(self, product: Product):
+        # Add a product's revenue to the running totals
+        self._apply(product, 1)
+
+    def remove(self, product: Product):
+        # Subtract a product's revenue from the running totals
+        self._apply(product, -1)
+
+    def revenue_by(self, field: str) -> Dict[Any, float]:
+        # Revenue per distinct value of a group field
+        return dict(self.by_field[field])
+
+    def _apply(self, product: Product, sign: int):
+        revenue = sign * product.sales_volume * product.price
+        self.count += sign
+        # Neumaier summation: keep the low-order bits lost by each addition
+        total = self._total + revenue
+        if abs(self._total) >= abs(revenue):
+            self._compensation += (self._total - total) + revenue
+        else:
+            self._compensation += (revenue - total) + self._total
+        self._total = total
+        for field in self.group_fields:
+            key = getattr(product, field)
+            counts = self._group_counts[field]
+            counts[key] += sign
+            if counts[key] == 0:
+                # Drop empty groups instead of leaving rounding residue behind
+                del counts[key]
+                self.by_field[field].pop(key, None)
+            else:
+                self.by_field[field][key] += revenue
+
+
+def group_revenue(products: Iterable[Product], field: str) -> Dict[Any, float]:
+    # One-off revenue breakdown by a field: vectorized for columnar stores, a single pass otherwise
+    if isinstance(products, ColumnarProductStore):
+        return RevenueAggregator.from_store(products, (field,)).revenue_by(field)
+    return RevenueAggregator.from_products(products, (field,)).revenue_by(field)
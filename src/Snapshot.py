@@ -0,0 +1,223 @@
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Union
+import numpy as np
+from Product import Product
+from ProductStore import ColumnarProductStore, PRODUCT_FIELDS, CATEGORICAL_FIELDS
+
+# A snapshot is a directory holding one raw little-endian file per fixed-width column, a UTF-8 string
+# heap plus row offsets for product names, an optional product_id sort order, and a JSON manifest
+# describing them. The manifest is written last, so a directory without one is an incomplete snapshot
+SNAPSHOT_FORMAT = "product-snapshot"
+SNAPSHOT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+STRING_FIELD = "product_name"
+# "r" maps the files read-only; "c" maps them copy-on-write, so edits stay in memory and never reach disk
+SNAPSHOT_MODES = ("r", "c")
+
+
+def _map(path: str, dtype: np.dtype, count: int, mode: str) -> np.ndarray:
+    # Memory-map count items of a column file; empty files cannot be mapped, so they get an empty array
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mode, shape=(count,))
+
+
+def _write(directory: str, filename: str, data: Union[np.ndarray, bytes]):
+    # Write one file through a temporary name, so re-saving over a snapshot that is still mapped is safe
+    path = os.path.join(directory, filename)
+    with open(path + ".tmp", "wb") as handle:
+        if isinstance(data, np.ndarray):
+            np.ascontiguousarray(data).tofile(handle)
+        else:
+            handle.write(data)
+    os.replace(path + ".tmp", path)
+
+
+def save_snapshot(products: Union[ColumnarProductStore, Iterable[Product]], directory: str) -> Dict[str, Any]:
+    # Write products (a columnar store or any iterable of Product records) as a snapshot; returns the manifest
+    store = products if isinstance(products, ColumnarProductStore) else ColumnarProductStore.from_products(products)
+    os.makedirs(directory, exist_ok=True)
+    rows = len(store)
+    columns = {}
+    for name in PRODUCT_FIELDS:
+        if name == STRING_FIELD:
+            continue
+        column = store.column(name)
+        dtype = column.dtype.newbyteorder("<") if column.dtype.byteorder == ">" else column.dtype
+        _write(directory, f"{name}.bin", column.astype(dtype, copy=False))
+        columns[name] = {"file": f"{name}.bin", "dtype": dtype.str}
+
+    encoded = [name.encode("utf-8") for name in store.column(STRING_FIELD).tolist()]
+    offsets = np.zeros(rows + 1, dtype="<i8")
+    np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=rows), out=offsets[1:])
+    _write(directory, f"{STRING_FIELD}.heap", b"".join(encoded))
+    _write(directory, f"{STRING_FIELD}.offsets", offsets)
+
+    # Row order sorting product_id, so lookups by ID can binary-search the mapped column.
+    # Catalogs whose IDs are already ascending (the usual case) need no order file
+    ids = store.column("product_id")
+    index = None
+    if rows > 1 and not bool(np.all(ids[1:] >= ids[:-1])):
+        _write(directory, "product_id.order", np.argsort(ids, kind="stable").astype("<i8"))
+        index = "product_id.order"
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "rows": rows,
+        "columns": columns,
+        "strings": {STRING_FIELD: {"heap": f"{STRING_FIELD}.heap", "offsets": f"{STRING_FIELD}.offsets",
+                                   "bytes": int(offsets[-1])}},
+        "categories": {name: list(store.categories[name]) for name in CATEGORICAL_FIELDS},
+        "index": {"product_id": index},
+    }
+    _write(directory, MANIFEST_NAME, json.dumps(manifest, indent=2).encode("utf-8"))
+    return manifest
+
+
+def read_manifest(directory: str) -> Dict[str, Any]:
+    # Load and validate a snapshot manifest
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No snapshot manifest in {directory}")
+    with open(path, encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{path} is not a product snapshot manifest")
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {manifest.get('version')}; expected {SNAPSHOT_VERSION}")
+    return manifest
+
+
+class MappedProductStore(ColumnarProductStore):
+    def __init__(self, directory: str, mode: str = "c"):
+        # Columnar store whose columns are memory-mapped from a snapshot directory. Opening only reads the
+        # manifest and maps the files; pages are loaded on first access and Product records are built only
+        # for the rows that are read. Product names stay in the string heap until a write needs them
+        if mode not in SNAPSHOT_MODES:
+            raise ValueError(f"Unknown snapshot mode {mode}; choose one of {SNAPSHOT_MODES}")
+        super().__init__(initial_capacity=1)
+        manifest = read_manifest(directory)
+        self.directory = directory
+        self.mode = mode
+        self.size = self.capacity = rows = manifest["rows"]
+        self.columns = {
+            name: _map(os.path.join(directory, spec["file"]), np.dtype(spec["dtype"]), rows, mode)
+            for name, spec in manifest["columns"].items()
+        }
+        for name, labels in manifest["categories"].items():
+            self.categories[name] = list(labels)
+            self._category_codes[name] = {label: code for code, label in enumerate(labels)}
+        strings = manifest["strings"][STRING_FIELD]
+        self._heap = _map(os.path.join(directory, strings["heap"]), np.dtype(np.uint8), strings["bytes"], "r")
+        self._offsets = _map(os.path.join(directory, strings["offsets"]), np.dtype("<i8"), rows + 1, "r")
+        order = manifest["index"]["product_id"]
+        self._id_order = _map(os.path.join(directory, order), np.dtype("<i8"), rows, "r") if order else None
+        # The on-disk ID index describes the rows as saved; any write to the store invalidates it
+        self.has_id_index = True
+
+    @property
+    def names_loaded(self) -> bool:
+        # True once product names have been decoded from the heap into an in-memory column
+        return STRING_FIELD in self.columns
+
+    def row_of(self, product_id: int) -> Optional[int]:
+        # Row holding product_id, found by binary search over the mapped ID column without building a dict
+        if not self.has_id_index:
+            raise ValueError("The snapshot ID index is stale after writes; index the store in memory instead")
+        ids = self.columns["product_id"][:self.size]
+        position = int(np.searchsorted(ids, product_id, sorter=self._id_order))
+        if position >= self.size:
+            return None
+        row = int(self._id_order[position]) if self._id_order is not None else position
+        return row if ids[row] == product_id else None
+
+    def rows_of(self, product_ids: np.ndarray) -> np.ndarray:
+        # Vectorized row_of: the row of each product ID, or -1 where it is missing
+        if not self.has_id_index:
+            raise ValueError("The snapshot ID index is stale after writes; index the store in memory instead")
+        product_ids = np.asarray(product_ids, dtype=np.int64)
+        if self.size == 0:
+            return np.full(len(product_ids), -1, dtype=np.int64)
+        ids = self.columns["product_id"][:self.size]
+        positions = np.minimum(np.searchsorted(ids, product_ids, sorter=self._id_order), self.size - 1)
+        rows = self._id_order[positions] if self._id_order is not None else positions
+        return np.where(ids[rows] == product_ids, rows, -1).astype(np.int64)
+
+    def column(self, name: str) -> np.ndarray:
+        # Return a view of the live part of a column, decoding product names on first request
+        if name == STRING_FIELD:
+            self._load_names()
+        return super().column(name)
+
+    @property
+    def nbytes(self) -> int:
+        # Approximate size of the live rows, counting the undecoded string heap by its mapped size
+        total = super().nbytes
+        if not self.names_loaded:
+            total += self._heap.nbytes + self._offsets.nbytes
+        return total
+
+    def __setitem__(self, index: int, product: Product):
+        self._before_write()
+        super().__setitem__(index, product)
+
+    def extend_columns(self, columns: Dict[str, Any]):
+        self._before_write()
+        super().extend_columns(columns)
+
+    def update_row(self, row: int, **updates):
+        self._before_write()
+        super().update_row(row, **updates)
+
+    def delete_rows(self, rows):
+        self._before_write()
+        super().delete_rows(rows)
+
+    def swap_remove(self, row: int) -> Optional[int]:
+        self._before_write()
+        return super().swap_remove(row)
+
+    def permute(self, order: np.ndarray):
+        self._before_write()
+        super().permute(order)
+
+    def _ensure_capacity(self, needed: int):
+        self._before_write()
+        super()._ensure_capacity(needed)
+
+    def _before_write(self):
+        # Every write path goes through here: refuse writes to read-only snapshots, otherwise make the
+        # names writable and drop the ID index. Numeric columns are copy-on-write maps, so only the pages
+        # actually written get private copies; growing past the mapped size copies them into RAM
+        if self.mode == "r":
+            raise ValueError(f"Snapshot {self.directory} is opened read-only; reopen it with mode='c' to edit")
+        self._load_names()
+        self.has_id_index = False
+
+    def _load_names(self):
+        # Decode every product name from the string heap into an object column
+        if self.names_loaded:
+            return
+        names = np.empty(self.capacity, dtype=object)
+        names[:self.size] = self._decode(np.arange(self.size))
+        self.columns[STRING_FIELD] = names
+
+    def _decode(self, rows: np.ndarray) -> List[str]:
+        # Decode the names of the given rows straight from the mapped heap
+        heap = memoryview(self._heap)
+        starts = self._offsets[rows].tolist()
+        stops = self._offsets[rows + 1].tolist()
+        return [str(heap[start:stop], "utf-8") for start, stop in zip(starts, stops)]
+
+    def _values(self, name: str, rows: np.ndarray) -> list:
+        # Python values of one field for the given rows; names come from the heap until decoded
+        if name == STRING_FIELD and not self.names_loaded:
+            return self._decode(rows)
+        return super()._values(name, rows)
+
+
+def open_snapshot(directory: str, mode: str = "c") -> MappedProductStore:
+    # Open a snapshot as a memory-mapped columnar store; mode "r" is read-only, "c" copy-on-write
+    return MappedProductStore(directory, mode)
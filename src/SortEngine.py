@@ -0,0 +1,195 @@
+from typing import Any, Callable, List, Optional, Sequence, Union
+import numpy as np
+from Product import Product
+
+# Inputs at least this large use NumPy lexsort over columns when strategy="auto"
+LEXSORT_THRESHOLD = 10_000
+
+STRATEGIES = ("auto", "timsort", "lexsort", "bubble", "merge", "quick")
+
+
+class DescendingKey:
+    # Wraps a key value so that ascending comparisons order it descending
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __gt__(self, other):
+        return other.value > self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def normalize_keys(keys: Union[str, Sequence[str]], descending: Union[bool, Sequence[bool]]):
+    # Turn the keys/descending arguments into parallel lists
+    fields = [keys] if isinstance(keys, str) else list(keys)
+    if isinstance(descending, bool):
+        directions = [descending] * len(fields)
+    else:
+        directions = list(descending)
+    if len(directions) != len(fields):
+        raise ValueError("descending must be a bool or have one entry per key")
+    return fields, directions
+
+
+def composite_key(fields: Sequence[str], directions: Sequence[bool]) -> Callable[[Any], Any]:
+    # Build one key function comparing several fields, each ascending or descending
+    if len(fields) == 1:
+        field = fields[0]
+        if directions[0]:
+            return lambda item: DescendingKey(getattr(item, field))
+        return lambda item: getattr(item, field)
+    return lambda item: tuple(
+        DescendingKey(getattr(item, f)) if d else getattr(item, f) for f, d in zip(fields, directions)
+    )
+
+
+def sort_products(products: Sequence[Product], keys: Union[str, Sequence[str]] = "price",
+                  descending: Union[bool, Sequence[bool]] = False, stable: bool = True,
+                  strategy: str = "auto") -> List[Product]:
+    # Return the products sorted by one or more fields, each ascending or descending.
+    # strategy picks the backend: "auto" uses Timsort for small inputs and NumPy lexsort over
+    # columns for large ones; "bubble", "merge" and "quick" run the teaching algorithms
+    fields, directions = normalize_keys(keys, descending)
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown sort strategy {strategy}; choose one of {STRATEGIES}.")
+    if strategy == "quick" and stable:
+        raise ValueError("Quick sort is not stable; pass stable=False to use it.")
+    if strategy == "auto":
+        columnar = hasattr(products, "column")
+        strategy = "lexsort" if columnar or len(products) >= LEXSORT_THRESHOLD else "timsort"
+
+    if strategy == "lexsort":
+        order = lexsort_order(products, fields, directions, stable)
+        if hasattr(products, "take"):
+            return products.take(order)
+        return [products[i] for i in order.tolist()]
+
+    items = list(products)
+    if strategy == "timsort":
+        # Stable sorts applied from the least to the most significant key honour each key's direction
+        for field, direction in reversed(list(zip(fields, directions))):
+            items.sort(key=lambda item: getattr(item, field), reverse=direction)
+        return items
+
+    key = composite_key(fields, directions)
+    if strategy == "bubble":
+        bubble_sort(items, key)
+    elif strategy == "merge":
+        merge_sort(items, key)
+    else:
+        quick_sort(items, key)
+    return items
+
+
+def _rank_column(values: np.ndarray) -> np.ndarray:
+    # Map a column to integers with the same ordering, so it can be negated for descending order
+    if values.dtype == object or values.dtype.kind in "US":
+        _, ranks = np.unique(values, return_inverse=True)
+        return ranks
+    if values.dtype.kind == "M":
+        return values.view(np.int64)
+    if values.dtype.kind in "bu":
+        return values.astype(np.int64)
+    return values
+
+
+def lexsort_order(products: Sequence[Product], fields: Sequence[str], directions: Sequence[bool],
+                  stable: bool = True) -> np.ndarray:
+    # Compute the sorted row order with NumPy, reading columns straight from a columnar store if given
+    columns = []
+    for field, direction in zip(fields, directions):
+        if hasattr(products, "decoded_column"):
+            values = products.decoded_column(field)
+        else:
+            values = np.asarray([getattr(p, field) for p in products])
+        values = _rank_column(values)
+        columns.append(-values if direction else values)
+    if len(columns) == 1:
+        return np.argsort(columns[0], kind="stable" if stable else "quicksort")
+    # lexsort treats the last key as the most significant and is always stable
+    return np.lexsort(columns[::-1])
+
+
+def bubble_sort(items: List, key: Callable[[Any], Any]):
+    # Sort in place by repeatedly swapping adjacent items that are out of order; stops early once a pass makes no swap
+    n = len(items)
+    for i in range(n):
+        swapped = False
+        for j in range(0, n - i - 1):
+            if key(items[j + 1]) < key(items[j]):
+                items[j], items[j + 1] = items[j + 1], items[j]
+                swapped = True
+        if not swapped:
+            break
+
+
+def merge_sort(items: List, key: Callable[[Any], Any]):
+    # Stable bottom-up merge sort in place: runs of width 1, 2, 4, ... are merged through one
+    # auxiliary buffer, so no sublists are copied per recursion level
+    n = len(items)
+    keys = [key(item) for item in items]
+    source, buffer = list(range(n)), [0] * n
+    width = 1
+    while width < n:
+        for low in range(0, n, 2 * width):
+            mid, high = min(low + width, n), min(low + 2 * width, n)
+            i, j, k = low, mid, low
+            # Take from the left run on ties to keep the sort stable
+            while i < mid and j < high:
+                if keys[source[j]] < keys[source[i]]:
+                    buffer[k] = source[j]
+                    j += 1
+                else:
+                    buffer[k] = source[i]
+                    i += 1
+                k += 1
+            buffer[k:k + mid - i] = source[i:mid]
+            k += mid - i
+            buffer[k:k + high - j] = source[j:high]
+        source, buffer = buffer, source
+        width *= 2
+    items[:] = [items[index] for index in source]
+
+
+def quick_sort(items: List, key: Callable[[Any], Any], low: int = 0, high: Optional[int] = None):
+    # In-place quick sort with a median-of-three pivot and three-way partitioning. It recurses into the
+    # smaller side and loops on the larger one, so the stack depth stays O(log n) even on sorted input
+    if high is None:
+        high = len(items) - 1
+    while low < high:
+        mid = (low + high) // 2
+        # Median of three: order items[low], items[mid], items[high] and use the middle one as pivot
+        if key(items[mid]) < key(items[low]):
+            items[low], items[mid] = items[mid], items[low]
+        if key(items[high]) < key(items[low]):
+            items[low], items[high] = items[high], items[low]
+        if key(items[high]) < key(items[mid]):
+            items[mid], items[high] = items[high], items[mid]
+        pivot = key(items[mid])
+
+        # Partition into < pivot, == pivot and > pivot
+        lt, i, gt = low, low, high
+        while i <= gt:
+            value = key(items[i])
+            if value < pivot:
+                items[lt], items[i] = items[i], items[lt]
+                lt += 1
+                i += 1
+            elif pivot < value:
+                items[i], items[gt] = items[gt], items[i]
+                gt -= 1
+            else:
+                i += 1
+
+        if lt - low < high - gt:
+            quick_sort(items, key, low, lt - 1)
+            low = gt + 1
+        else:
+            quick_sort(items, key, gt + 1, high)
+            high = lt - 1
@@ -0,0 +1,95 @@
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Sequence
+from math import inf
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+from Product import Product
+
+# Product fields that managers keep a persistent sorted index for
+INDEXED_FIELDS = ("price", "rating", "sales_volume")
+
+
+class SliceView(Sequence):
+    def __init__(self, items: Sequence, start: int, stop: int, transform: Optional[Callable[[Any], Any]] = None):
+        # Read-only view of items[start:stop] that copies nothing; transform, if given, is applied to each
+        # item as it is read. The view reads through to items, so it is only meaningful until they change
+        self.items = items
+        self.start = start
+        self.stop = max(start, stop)
+        self.transform = transform
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return SliceView(self.items, self.start + start, self.start + stop, self.transform)
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("slice view index out of range")
+        item = self.items[self.start + index]
+        return self.transform(item) if self.transform else item
+
+    def __iter__(self) -> Iterator:
+        for position in range(self.start, self.stop):
+            item = self.items[position]
+            yield self.transform(item) if self.transform else item
+
+    def __repr__(self) -> str:
+        return f"SliceView([{self.start}:{self.stop}] of {len(self.items)})"
+
+
+class SortedIndex:
+    def __init__(self, field: str):
+        # Keep (value, product_id) pairs in sorted order for one product field
+        self.field = field
+        self.entries: List[Tuple[float, int]] = []
+
+    @classmethod
+    def build(cls, field: str, products: Iterable[Product]) -> "SortedIndex":
+        # Build an index over existing products with a single sort
+        index = cls(field)
+        index.entries = sorted((getattr(p, field), p.product_id) for p in products)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, value, product_id: int):
+        # Insert a product's value at its sorted position (binary search + list insert)
+        insort(self.entries, (value, product_id))
+
+    def remove(self, value, product_id: int):
+        # Remove the entry for a product; its value must be the one it was indexed with
+        position = bisect_left(self.entries, (value, product_id))
+        if position < len(self.entries) and self.entries[position] == (value, product_id):
+            del self.entries[position]
+
+    def update(self, old_value, new_value, product_id: int):
+        # Move a product's entry after its field value changed
+        self.remove(old_value, product_id)
+        self.add(new_value, product_id)
+
+    def bounds(self, low=None, high=None) -> Tuple[int, int]:
+        # Return the [start, stop) entry positions whose values fall in the inclusive range [low, high]
+        start = 0 if low is None else bisect_left(self.entries, (low, -inf))
+        stop = len(self.entries) if high is None else bisect_right(self.entries, (high, inf))
+        return start, max(start, stop)
+
+    def range(self, low=None, high=None) -> List[int]:
+        # Return product IDs with low <= value <= high in value order, in O(log n + k)
+        start, stop = self.bounds(low, high)
+        return [product_id for _, product_id in self.entries[start:stop]]
+
+    def view(self, low=None, high=None, transform: Optional[Callable[[Tuple[Any, int]], Any]] = None) -> SliceView:
+        # Lazy view of the (value, product_id) entries with low <= value <= high, in O(log n) and no copying
+        start, stop = self.bounds(low, high)
+        return SliceView(self.entries, start, stop, transform)
+
+    def find(self, value) -> Optional[int]:
+        # Return the ID of the first product whose value equals the given value
+        start, stop = self.bounds(value, value)
+        return self.entries[start][1] if start < stop else None
@@ -1,5 +1,10 @@
+import heapq
+from array import array
 from collections import defaultdict
-from typing import List, Tuple, Dict
+from itertools import combinations
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from Product import Product
 
 class SupplierGraph:
     def __init__(self):
@@ -7,10 +12,27 @@ class SupplierGraph:
         self.graph: Dict[int, Dict[int, int]] = defaultdict(dict)
         # Initialize suppliers using a defaultdict of sets to keep track of product categories for each supplier
         self.suppliers: Dict[int, set] = defaultdict(set)
+        # Inverted index from each product category to the suppliers offering it
+        self.categories: Dict[str, set] = defaultdict(set)
+
+    @classmethod
+    def from_products(cls, products: Iterable[Product]) -> "SupplierGraph":
+        # Build a supplier graph from a product collection's supplier_id and category fields
+        graph = cls()
+        graph.add_products(products)
+        graph.create_graph()
+        return graph
 
     def add_product(self, supplier_id: int, category: str):
         # Add a product category to a supplier
         self.suppliers[supplier_id].add(category)
+        self.categories[category].add(supplier_id)
+
+    def add_products(self, products: Iterable[Product]):
+        # Register the supplier and category of every product in a collection
+        for product in products:
+            if product is not None:
+                self.add_product(product.supplier_id, product.category)
 
     def add_edge(self, supplier_id1: int, supplier_id2: int, weight: int):
         # Add an undirected edge between two suppliers with a given weight (shared categories)
@@ -22,88 +44,123 @@ class SupplierGraph:
         return len(self.suppliers[supplier_id1].intersection(self.suppliers[supplier_id2]))
 
     def create_graph(self):
-        # Create the supplier graph by adding edges based on shared product categories
-        supplier_ids = list(self.suppliers.keys())
-        for i in range(len(supplier_ids)):
-            for j in range(i + 1, len(supplier_ids)):
-                # Calculate weight based on shared categories and add edge if weight > 0
-                weight = self.find_shared_categories(supplier_ids[i], supplier_ids[j])
-                if weight > 0:
-                    self.add_edge(supplier_ids[i], supplier_ids[j], weight)
-
-    def prim_mst(self) -> List[Tuple[int, int]]:
-        # Generate the Minimum Spanning Tree (MST) using Prim's algorithm
-        start_supplier = next(iter(self.graph))  # Start from an arbitrary supplier
-        visited = set([start_supplier])  # Track visited suppliers
-        edges = []  # Temporary list to store candidate edges for the MST
-        min_edges = []  # List to store the edges of the MST
-
-        # Continue until all suppliers are visited
-        while len(visited) < len(self.graph):
-            # Explore all edges from the visited suppliers
-            for u in visited:
-                for v in self.graph[u]:
-                    if v not in visited:
-                        edges.append((u, v, self.graph[u][v]))  # Store the edge with its weight
-            
-            edges.sort(key=lambda x: x[2])  # Sort edges by weight
-            
-            # Add the minimum weight edge that connects to a new supplier
-            for edge in edges:
-                if edge[1] not in visited:
-                    min_edges.append((edge[0], edge[1]))
-                    visited.add(edge[1])  # Mark the supplier as visited
-                    break
-            edges = []  # Clear edges for the next iteration
-
-        return min_edges  # Return the edges of the MST
+        # Create the supplier graph by adding edges based on shared product categories.
+        # Only suppliers listed under the same category are paired, so the work scales with
+        # the number of co-occurring pairs instead of all supplier pairs
+        rank = {supplier_id: i for i, supplier_id in enumerate(self.suppliers)}
+        weights: Dict[Tuple[int, int], int] = defaultdict(int)
+        for suppliers in self.categories.values():
+            ranked = sorted(rank[supplier_id] for supplier_id in suppliers)
+            for pair in combinations(ranked, 2):
+                weights[pair] += 1  # Each shared category adds one to the pair's weight
+        # Add edges in supplier insertion order, matching the pairwise construction
+        supplier_ids = list(self.suppliers)
+        for (i, j) in sorted(weights):
+            self.add_edge(supplier_ids[i], supplier_ids[j], weights[(i, j)])
+
+    def prim_mst(self, with_weights: bool = False) -> List[Tuple]:
+        # Generate the Minimum Spanning Tree (MST) using Prim's algorithm; on a disconnected
+        # graph this is a spanning forest with one tree per connected component
+        forest = self.prim_msf()
+        if with_weights:
+            return forest
+        return [(u, v) for u, v, _ in forest]
+
+    def prim_msf(self) -> List[Tuple[int, int, int]]:
+        # Lazy priority-queue Prim's algorithm in O(E log V), returning (supplier1, supplier2, weight) edges.
+        # Each unvisited supplier starts a new tree, so disconnected graphs terminate with a forest
+        visited = set()
+        msf_edges = []
+        counter = 0  # Tie-breaker so equal weights pop in the order they were discovered
+        for start_supplier in self.graph:
+            if start_supplier in visited:
+                continue
+            visited.add(start_supplier)
+            heap = []
+            for v, weight in self.graph[start_supplier].items():
+                heapq.heappush(heap, (weight, counter, start_supplier, v))
+                counter += 1
+            while heap:
+                weight, _, u, v = heapq.heappop(heap)
+                if v in visited:
+                    continue  # Stale entry: v was reached by a cheaper edge
+                visited.add(v)
+                msf_edges.append((u, v, weight))
+                # Offer every edge leaving the newly visited supplier
+                for w, edge_weight in self.graph[v].items():
+                    if w not in visited:
+                        heapq.heappush(heap, (edge_weight, counter, v, w))
+                        counter += 1
+        return msf_edges
 
     def find_parent(self, parent: List[int], i: int) -> int:
-        # Helper function to find the root parent of a node with path compression
-        if parent[i] == i:
-            return i
-        return self.find_parent(parent, parent[i])
+        # Helper function to find the root parent of a node, iteratively with path halving
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # Point every other node on the path at its grandparent
+            i = parent[i]
+        return i
 
-    def kruskal_mst(self) -> List[Tuple[int, int]]:
-        # Generate the Minimum Spanning Tree (MST) using Kruskal's algorithm
-        edges = []  # List to store all edges with their weights
-        
-        # Gather all edges from the graph
-        for u in self.graph:
-            for v in self.graph[u]:
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Return every undirected edge once as parallel (supplier1, supplier2, weight) NumPy arrays
+        us, vs, weights = [], [], []
+        for u, neighbours in self.graph.items():
+            for v, weight in neighbours.items():
                 if u < v:  # Avoid duplicate edges
-                    edges.append((self.graph[u][v], u, v))  # Store (weight, supplier1, supplier2)
-
-        edges.sort(key=lambda x: x[0])  # Sort edges by weight
-        
-        max_id = max(self.graph.keys())  # Get the highest supplier ID for initializing union-find
-        parent = list(range(max_id + 1))  # Create a parent list for union-find
-        rank = [0] * (max_id + 1)  # Create a rank list to optimize union-find
-
-        # Helper function to find the root parent of a node with path compression
-        def find_parent(i: int) -> int:
-            if parent[i] != i:
-                parent[i] = find_parent(parent[i])  # Path compression
-            return parent[i]
-
-        # Helper function to union two sets
-        def union(u: int, v: int):
-            u_root = find_parent(u)  # Find root of u
-            v_root = find_parent(v)  # Find root of v
-            if rank[u_root] < rank[v_root]:
-                parent[u_root] = v_root  # Attach smaller rank tree under higher rank tree
-            elif rank[u_root] > rank[v_root]:
-                parent[v_root] = u_root
-            else:
-                parent[v_root] = u_root  # Make one as root and increase its rank
-                rank[u_root] += 1
+                    us.append(u)
+                    vs.append(v)
+                    weights.append(weight)
+        return (np.asarray(us, dtype=np.int64), np.asarray(vs, dtype=np.int64),
+                np.asarray(weights, dtype=np.int64))
+
+    def kruskal_mst(self, with_weights: bool = False) -> List[Tuple]:
+        # Generate the Minimum Spanning Tree (MST) using Kruskal's algorithm
+        us, vs, weights = self.edge_arrays()
+        if len(weights) == 0:
+            return []
+
+        # Remap sparse supplier IDs to dense 0..n-1 so union-find memory depends on the supplier count only
+        supplier_ids, dense = np.unique(np.concatenate([us, vs]), return_inverse=True)
+        dense_u, dense_v = dense[:len(us)], dense[len(us):]
 
+        # Sort edges by weight with a stable argsort, keeping discovery order for equal weights
+        order = np.argsort(weights, kind="stable")
+        union_find = UnionFind(len(supplier_ids))
         mst_edges = []  # List to store the edges of the MST
-        for weight, u, v in edges:
-            u_root = find_parent(u)  # Find root of u
-            v_root = find_parent(v)  # Find root of v
-            if u_root != v_root:  # If they are in different sets, union them
-                mst_edges.append((u, v))  # Add edge to MST
-                union(u, v)  # Union the two sets
+        for u, v, weight in zip(dense_u[order].tolist(), dense_v[order].tolist(), weights[order].tolist()):
+            if union_find.union(u, v):  # If they were in different sets, the edge joins them
+                edge = (int(supplier_ids[u]), int(supplier_ids[v]))
+                mst_edges.append(edge + (weight,) if with_weights else edge)
+                if len(mst_edges) == len(supplier_ids) - 1:
+                    break  # A spanning tree is complete
 
         return mst_edges  # Return the edges of the MST
+
+
+class UnionFind:
+    def __init__(self, size: int):
+        # Disjoint sets over 0..size-1 held in flat integer arrays
+        self.parent = array("q", range(size))
+        self.rank = array("b", bytes(size))
+
+    def find(self, i: int) -> int:
+        # Find the root of i iteratively, halving the path as it goes
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, u: int, v: int) -> bool:
+        # Union by rank; returns False if u and v were already in the same set
+        u_root = self.find(u)  # Find root of u
+        v_root = self.find(v)  # Find root of v
+        if u_root == v_root:
+            return False
+        if self.rank[u_root] < self.rank[v_root]:
+            self.parent[u_root] = v_root  # Attach smaller rank tree under higher rank tree
+        elif self.rank[u_root] > self.rank[v_root]:
+            self.parent[v_root] = u_root
+        else:
+            self.parent[v_root] = u_root  # Make one as root and increase its rank
+            self.rank[u_root] += 1
+        return True
@@ -1,3 +1,6 @@
+import logging
+import sys
+from dataclasses import asdict
 from Product import Product
 from BasicProductManager import BasicProductManager
 from DynamicProductManager import DynamicProductManager
@@ -5,6 +8,7 @@ from ExponentialSearch import exponential_search
 from KWayMergeSort import k_way_merge_sort
 from HashTable import HashTableChaining, HashTableOpenAddressing
 from SupplierGraph import SupplierGraph
+from Instrumentation import profile_capture
 
 def main():
     # Part 1: Data Structures and Types
@@ -33,7 +37,7 @@ def main():
     # Display all products in BasicProductManager
     print("Basic Product Manager Products:")
     for product in basic_manager.products:
-        print(vars(product))
+        print(asdict(product))
     
     # Update and delete operations
     print("\nUpdating product with ID 101...")
@@ -55,7 +59,7 @@ def main():
     print("Dynamic Product Manager Products:")
     for product in dynamic_manager.products:
         if product is not None:
-            print(vars(product))
+            print(asdict(product))
 
     # Delete product from DynamicProductManager
     print("\nDeleting product with ID 102...")
@@ -65,7 +69,7 @@ def main():
     print("Products after deletion:")
     for product in dynamic_manager.products:
         if product is not None:
-            print(vars(product))
+            print(asdict(product))
 
     # Part 3: Recursion and Backtracking
     print("\n=== Part 3: Recursion and Backtracking ===")
@@ -84,21 +88,21 @@ def main():
     product_name_search = "Smart TV 50 inch"
     found_product = basic_manager.linear_search(product_name_search)
     if found_product:
-        print(f"Linear search: Found product by name: {vars(found_product)}\n")
+        print(f"Linear search: Found product by name: {asdict(found_product)}\n")
 
     # Binary search for a product by ID
     product_id_search = 103
     basic_manager.products.sort(key=lambda x: x.product_id) 
     found_product_id = basic_manager.binary_search(product_id_search)
     if found_product_id:
-        print(f"Binary search: Found product by ID: {vars(found_product_id)}\n")
+        print(f"Binary search: Found product by ID: {asdict(found_product_id)}\n")
 
     # Interpolation search for a product by price
     product_price_search = 129.99
     basic_manager.products.sort(key=lambda x: x.price) 
     found_product_price = basic_manager.interpolation_search(product_price_search)
     if found_product_price:
-        print(f"Interpolation search: Found product by price: {vars(found_product_price)}\n")
+        print(f"Interpolation search: Found product by price: {asdict(found_product_price)}\n")
 
     # Part 5: Sorting Algorithms
     print("\n=== Part 5: Sorting Algorithms ===")
@@ -185,14 +189,18 @@ def main():
     k_sorted_products = k_way_merge_sort(basic_manager.products, k=3)
     print("K-Way Merge Sorted Products by Sales Volume (Descending):")
     for product in k_sorted_products:
-        print(vars(product))
+        print(asdict(product))
 
     # Exponential Search for a specific rating
     basic_manager.products.sort(key=lambda x: x.rating)
     print("\nExponential Search for Rating 4.7:")
     found_rating = exponential_search(basic_manager.products, 4.7)
     if found_rating:
-        print(f"Found product by rating: {vars(found_rating)}")
+        print(f"Found product by rating: {asdict(found_rating)}")
 
 if __name__ == "__main__":
-    main()
+    # Show the managers' log messages on stdout as plain lines; set CATALOG_PROFILE=cprofile or
+    # tracemalloc to profile the run
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    with profile_capture():
+        main()